@@ -0,0 +1,369 @@
+#------------------------------------------------------------------------
+# Tetris AI (no pygame / pyglet imports)
+# Scores every reachable placement of the current stone with a weighted
+# sum of board heuristics and returns the best move sequence.
+#------------------------------------------------------------------------
+import time
+
+from engine import Moves, check_collision, join_matrices, rotate_clockwise
+from bitboard import BitBoard, shape_masks
+from placements import placements, spawn_blocked
+from features import BoardFeatures, row_masks, score
+from cache import TranspositionCache, board_key, default_max_bytes
+from profiler import clock
+
+#------------------------------------------------------------------------
+# This sections contains the following mechanics:
+# 1. Memory
+#	a. Hold variables of heuristic interest
+# 2. Train
+#	a. Determines best moves according to given weights
+#	b. Enumerate all possible move combinations, then score them
+#		- Returns ([list of move combinations], [list of Memory states])
+#		- Move combinations + landing rows come from the placement table
+#		  (placements.py), each state is the board with the stone placed
+#		- Go through with original orientation 
+# 		- Translate normal orientation, then iterate left + right translations
+#		- Iterate through possible (distinct) rotations
+#		- Translate rotated orientations, then iterate through left + right orientations
+#	c. Go through with movement if translate is successful
+#	d. Go through with tetromino rotations if rotation was successful
+#	e. Insta drop
+#	f. Soft drop
+# 3. Boards are either a list of lists or a BitBoard (bitboard.py)
+#	- Train(weights, bitboard=True) converts list boards once per stone
+# 4. Lookahead (Train(weights, lookahead=True)): uses the next stone too
+#	- Every placement of the current stone is scored as the best placement
+#	  of the next stone on the board it leaves (after its line clears)
+#	- beam: only the best `beam` first placements (by their own score) are
+#	  expanded, best first
+#	- budget: seconds per stone, expansion stops once it is spent (the best
+#	  first placement is always expanded)
+# 5. Lookahead children are built on one scratch BitBoard (place, score,
+#	then remove the stone, or copy the rows back after a line clear)
+# 6. Candidate features are cached per (board, stone) in a bounded LRU
+#	TranspositionCache (cache.py) when one is given; the lookahead always
+#	uses one, of at most cache_bytes (estimated) when it builds its own.
+#	Features do not depend on the weights, so a cache can be shared by
+#	every Train (individual) in a process.
+# 7. Train(weights, profiler=PhaseProfiler()) records the enumerate,
+#	features and scoring phases (profiler.py)
+# 8. Train(weights, exporter=DecisionExporter(directory)) appends every
+#	decision (board, candidate features, chosen index) to a dataset
+#	(dataset.py); phases are not profiled while exporting
+#------------------------------------------------------------------------
+game_over_move = (Moves.DROP,)
+
+class Memory:
+    __slots__ = ("board", "stone", "stone_x", "stone_y")
+
+    def __init__(self, board, stone, stone_x, stone_y):
+        self.board = board
+        self.stone = stone
+        self.stone_x = stone_x
+        self.stone_y = stone_y
+
+    @staticmethod
+    def clone(data):
+        if isinstance(data.board, BitBoard):
+            return Memory(data.board.clone(), data.stone[:], data.stone_x, data.stone_y)
+        board_copy = list()
+        for row in data.board:
+            board_copy.append(row[:])
+        return Memory(board_copy, data.stone[:], data.stone_x, data.stone_y)
+
+class Train:
+    def __init__(self, weights, bitboard = False, batch = False,
+                 lookahead = False, beam = None, budget = None, cache = None, profiler = None,
+                 exporter = None, cache_bytes = default_max_bytes):
+        self.weights = weights
+        self.bitboard = bitboard
+        self.batch = batch
+        self.lookahead = lookahead
+        self.beam = beam
+        self.budget = budget
+        if cache is None and lookahead:
+            cache = TranspositionCache(max_bytes=cache_bytes)
+        self.cache = cache
+        self.profiler = profiler
+        self.exporter = exporter
+        self.next_stone = None
+        self.scratch = None
+
+    def set_board(self, board, stone, next_stone = None):
+        self.next_stone = next_stone
+        if self.bitboard and not isinstance(board, BitBoard):
+            board = BitBoard.from_matrix(board)
+        if isinstance(board, BitBoard):
+            self.num_rows = len(board.rows) - 1
+            self.num_cols = board.width
+            self.check_collision = BitBoard.check_collision
+            self.join_matrices = BitBoard.join_matrices
+        else:
+            self.num_rows = len(board) - 1
+            self.num_cols = len(board[0])
+            self.check_collision = check_collision
+            self.join_matrices = join_matrices
+        self.begin_state = Memory(board, stone, int(self.num_cols / 2 - len(stone[0])/2), 0)
+
+#------------------------------------------------------------------------------------------
+# The score for each move is computed by assessing the grid the move would result in. 
+# This assessment is based on four heuristics: 
+# 	- aggregate height, complete lines, holes, and bumpiness
+# 	- AI will try to either minimize or maximize each of these factors
+# Features of every candidate are updated from the current board in one
+# pass (features.py) and scored with a dot product against the weights.
+# Train(weights, batch=True) scores all candidates at once with NumPy (npfeatures.py),
+# which is only imported then, so the greedy path never loads NumPy.
+# A stone that collides at its spawn (game over) has no placements, it is just dropped.
+#------------------------------------------------------------------------------------------
+    def get_best_move(self):
+        if spawn_blocked(self.begin_state.board, self.begin_state.stone, self.num_cols):
+            return game_over_move
+        if self.exporter is not None:
+            return self.exported_best_move()
+        if self.profiler is not None:
+            return self.profiled_best_move()
+        board = self.begin_state.board
+        if self.lookahead and self.next_stone is not None:
+            return self.lookahead_move()
+        if self.batch:
+            from npfeatures import batch_features, best_index, candidate_cells
+            candidates = list(placements(board, self.begin_state.stone, self.num_cols))
+            cells = candidate_cells(board, [(rotation, x, landing) for (path, rotation, x, landing) in candidates])
+            return candidates[best_index(batch_features(cells), self.weights)][0]
+        candidates = self.candidates(board, self.begin_state.stone)
+        scores = [score(self.weights, features) for (path, rotation, x, landing, features) in candidates]
+        return candidates[scores.index(max(scores))][0]
+
+    def exported_best_move(self):
+        board = self.begin_state.board
+        stone = self.begin_state.stone
+        candidates = self.candidates(board, stone)
+        features = [features for (path, rotation, x, landing, features) in candidates]
+        if self.lookahead and self.next_stone is not None:
+            path = self.lookahead_move()
+            index = [candidate[0] for candidate in candidates].index(path)
+        else:
+            scores = [score(self.weights, vector) for vector in features]
+            index = scores.index(max(scores))
+            path = candidates[index][0]
+        self.exporter.record(row_masks(board), stone, features, index)
+        return path
+
+    def profiled_best_move(self):
+        profiler = self.profiler
+        board = self.begin_state.board
+        if self.lookahead and self.next_stone is not None:
+            nested = profiler.seconds["enumerate"] + profiler.seconds["features"]
+            start = clock()
+            path = self.lookahead_move()
+            nested = profiler.seconds["enumerate"] + profiler.seconds["features"] - nested
+            profiler.add("scoring", clock() - start - nested)
+            return path
+        if self.batch:
+            from npfeatures import batch_features, best_index, candidate_cells
+            start = clock()
+            candidates = list(placements(board, self.begin_state.stone, self.num_cols))
+            enumerated = clock()
+            cells = candidate_cells(board, [(rotation, x, landing) for (path, rotation, x, landing) in candidates])
+            features = batch_features(cells)
+            extracted = clock()
+            path = candidates[best_index(features, self.weights)][0]
+            profiler.add("enumerate", enumerated - start)
+            profiler.add("features", extracted - enumerated)
+            profiler.add("scoring", clock() - extracted)
+            return path
+        candidates = self.candidates(board, self.begin_state.stone)
+        start = clock()
+        scores = [score(self.weights, features) for (path, rotation, x, landing, features) in candidates]
+        path = candidates[scores.index(max(scores))][0]
+        profiler.add("scoring", clock() - start)
+        return path
+
+#------------------------------------------------------------------------
+# Returns [(moves, rotation, x, landing, features)] for every placement
+#------------------------------------------------------------------------
+    def candidates(self, board, stone):
+        if self.profiler is not None:
+            return self.profiled_candidates(board, stone)
+        rows = row_masks(board)
+        if self.cache is not None:
+            key = board_key(rows, self.num_cols, stone)
+            candidates = self.cache.get(key)
+            if candidates is not None:
+                return candidates
+        parent = BoardFeatures(rows, self.num_cols)
+        candidates = [(path, rotation, x, landing, parent.child(rotation, x, landing))
+                      for (path, rotation, x, landing) in placements(board, stone, self.num_cols, parent.tops)]
+        if self.cache is not None:
+            self.cache.put(key, candidates)
+        return candidates
+
+    def profiled_candidates(self, board, stone):
+        profiler = self.profiler
+        start = clock()
+        rows = row_masks(board)
+        if self.cache is not None:
+            key = board_key(rows, self.num_cols, stone)
+            candidates = self.cache.get(key)
+            if candidates is not None:
+                profiler.add("features", clock() - start)
+                return candidates
+        parent = BoardFeatures(rows, self.num_cols)
+        enumerating = clock()
+        found = list(placements(board, stone, self.num_cols, parent.tops))
+        enumerated = clock()
+        candidates = [(path, rotation, x, landing, parent.child(rotation, x, landing))
+                      for (path, rotation, x, landing) in found]
+        if self.cache is not None:
+            self.cache.put(key, candidates)
+        profiler.add("enumerate", enumerated - enumerating)
+        profiler.add("features", clock() - enumerated + enumerating - start)
+        return candidates
+
+    def lookahead_move(self):
+        board = self.begin_state.board
+        bits = board if isinstance(board, BitBoard) else BitBoard.from_matrix(board)
+        if self.scratch is None or len(self.scratch.rows) != len(bits.rows):
+            self.scratch = bits.clone()
+        else:
+            self.scratch.copy_from(bits)
+        child = self.scratch
+        first = [(score(self.weights, features), path, rotation, x, landing)
+                 for (path, rotation, x, landing, features) in self.candidates(bits, self.begin_state.stone)]
+
+        order = sorted(range(len(first)), key=lambda i: -first[i][0])
+        if self.beam is not None:
+            order = order[:self.beam]
+        deadline = time.perf_counter() + self.budget if self.budget is not None else None
+
+        best_value = None
+        best_path = first[order[0]][1]
+        for i in order:
+            (first_score, path, rotation, x, landing) = first[i]
+            child.place(rotation.masks, x, landing)
+            cleared = child.clear_lines()
+            value = self.best_follow_up(child, self.next_stone) + self.weights[1] * cleared
+            if cleared:
+                child.copy_from(bits)
+            else:
+                child.remove(rotation.masks, x, landing)
+            if best_value is None or value > best_value:
+                best_value = value
+                best_path = path
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+        return best_path
+
+    def best_follow_up(self, bits, stone):
+        best = float("-inf")
+        for (path, rotation, x, landing, features) in self.candidates(bits, stone):
+            best = max(best, score(self.weights, features))
+        return best
+
+    def enumerate(self, begin_state):
+        moves = list()
+        states = list()
+
+        for (path, rotation, x, landing) in placements(begin_state.board, begin_state.stone, self.num_cols):
+            state = Memory.clone(begin_state)
+            state.stone = rotation.shape
+            state.stone_x = x
+            self.place(state, rotation, landing)
+            moves.append(path)
+            states.append(state)
+
+        return (moves, states)
+
+    def place(self, data, rotation, landing):
+        if isinstance(data.board, BitBoard):
+            data.board.place(rotation.masks, data.stone_x, landing)
+        else:
+            data.board = join_matrices(data.board, data.stone, (data.stone_x, landing + 1))
+        data.stone_y = landing + 1
+
+    def move(self, data, delta_x):
+        new_x = data.stone_x + delta_x
+        if new_x < 0 or new_x > self.num_cols - len(data.stone[0]):
+            return False
+        if not self.check_collision(data.board, data.stone, (new_x, data.stone_y)):
+            data.stone_x = new_x
+            return True
+        return False
+
+    def rotate_stone(self, data):
+        new_stone = rotate_clockwise(data.stone)
+        if not self.check_collision(data.board, new_stone, (data.stone_x, data.stone_y)):
+            data.stone = new_stone
+            return True
+        return False
+
+    def insta_drop(self, data):
+        if isinstance(data.board, BitBoard):
+            masks = shape_masks(data.stone)
+            landing = data.board.drop_row(masks, data.stone_x, data.stone_y)
+            data.board.place(masks, data.stone_x, landing)
+            data.stone_y = landing + 1
+            return
+        while not self.drop(data):
+            pass
+
+    def drop(self, data):
+        data.stone_y += 1
+        if self.check_collision(data.board, data.stone, (data.stone_x, data.stone_y)):
+            data.board = self.join_matrices(data.board, data.stone, (data.stone_x, data.stone_y))
+            return True
+        return False
+
+#------------------------------------------------------------------------
+# These methods calculate the following heuristic variables
+# 	- aggregate height, complete lines, holes, and slope
+#------------------------------------------------------------------------
+    def heights(self, data):
+        if isinstance(data.board, BitBoard):
+            return data.board.heights()
+        heights = list()
+        for col in range(self.num_cols):
+            count = 0
+            for row in range(self.num_rows):
+                if data.board[row][col] == 0:
+                    count += 1
+                else:
+                    break
+            heights.append(self.num_rows - count)
+        return heights
+
+    def aggregate_height(self, data):
+        return sum(self.heights(data))
+
+    def complete_lines(self, data):
+        if isinstance(data.board, BitBoard):
+            return data.board.complete_lines()
+        count = 0
+        for line in data.board[:-1]:
+            if 0 not in line:
+                count += 1
+        return count
+
+    def holes(self, data):
+        if isinstance(data.board, BitBoard):
+            return data.board.holes()
+        holes = 0
+        for col in range(self.num_cols):
+            empty = 0
+            for row in range(self.num_rows - 1, -1, -1):
+                if data.board[row][col] == 0:
+                    empty += 1
+                else:
+                    holes += empty
+                    empty = 0
+        return holes
+
+    def slope(self, data):
+        board_heights = self.heights(data)
+        slope = 0
+        for i in range(self.num_cols - 1):
+            slope += abs(board_heights[i] - board_heights[i + 1])
+        return slope
+
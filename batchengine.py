@@ -0,0 +1,186 @@
+#------------------------------------------------------------------------
+# Lockstep batched engine: N games (one weight vector each) in NumPy
+# 1. Boards are packed row masks, one (N, rows + 5) int32 array
+#	- bit x set = cell x filled, row `rows` is the floor, the 4 rows below
+#	  it are full padding so every 4-row window is in range
+# 2. Every step places one stone in every running game:
+#	- Candidates come from a per-piece table in the same order as
+#	  placements.py (rotation, spawn x, left moves, right moves), with the
+#	  placements that reach each one, so blocked spawn moves are masked
+#	- Landing rows: first row where the stone's 4-row window collides
+#	- Features (aggregate height, complete lines, holes, bumpiness) from
+#	  the column tops, holes = aggregate height - filled cells
+#	- Scores are summed in the same order as features.score, so the
+#	  argmax picks the same placement as Train (greedy)
+#	- Placement, line clears and scoring follow GameEngine: hard drop
+#	  points, the next stone is checked before the lines are cleared,
+#	  add_cl_lines levels
+# 3. Ended games (game over or max_pieces) are masked out, only the
+#    running games are stepped
+#------------------------------------------------------------------------
+import numpy as np
+
+from engine import cols, rows, tetris_shapes
+from placements import rotations
+
+linescores = np.array([0, 40, 100, 300, 1200], dtype=np.int64)
+_tables = None
+
+class PieceTable:
+    def __init__(self, width, height):
+        no_cell = 2 * height
+        entries = list()
+        for stone in tetris_shapes:
+            spawn_x = int(width / 2 - len(stone[0])/2)
+            candidates = list()
+            spawns = list()
+            for rotation in rotations(stone):
+                if not rotation.unique:
+                    continue
+                spawns.append(len(candidates))
+                candidates.append((rotation, spawn_x, list(spawns)))
+                for delta_x in (-1, 1):
+                    chain = list(spawns)
+                    x = spawn_x + delta_x
+                    while 0 <= x and x + rotation.width <= width:
+                        chain.append(len(candidates))
+                        candidates.append((rotation, x, list(chain)))
+                        x += delta_x
+            entries.append(candidates)
+
+        size = max(len(candidates) for candidates in entries)
+        pieces = len(tetris_shapes)
+        self.size = size
+        self.valid = np.zeros((pieces, size), dtype=bool)
+        self.masks = np.zeros((pieces, size, 4), dtype=np.int32)
+        self.tops = np.full((pieces, size, width), no_cell, dtype=np.int32)
+        self.needs = np.zeros((pieces, size, size), dtype=bool)
+        self.rotation = np.zeros((pieces, size), dtype=np.int8)
+        self.x = np.zeros((pieces, size), dtype=np.int8)
+        for p, candidates in enumerate(entries):
+            for c, (rotation, x, chain) in enumerate(candidates):
+                self.valid[p, c] = True
+                self.rotation[p, c] = rotation.num_rot
+                self.x[p, c] = x
+                for i, mask in enumerate(rotation.masks):
+                    self.masks[p, c, i] = mask << x
+                for cx, top in enumerate(rotation.tops):
+                    self.tops[p, c, x + cx] = top
+                self.needs[p, c, chain] = True
+
+def tables():
+    global _tables
+    if _tables is None:
+        _tables = PieceTable(cols, rows)
+    return _tables
+
+class BatchEngine:
+    def __init__(self, n, width = cols, height = rows):
+        self.n = n
+        self.width = width
+        self.height = height
+        self.full = (1 << width) - 1
+        self.table = tables() if (width, height) == (cols, rows) else PieceTable(width, height)
+        self.windows = np.arange(height + 1)[:, None] + np.arange(4)[None, :]
+        self.reset()
+
+    def reset(self):
+        n = self.n
+        self.rows = np.zeros((n, self.height + 5), dtype=np.int32)
+        self.rows[:, self.height:] = self.full
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lines = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.placements = np.zeros(n, dtype=np.int64)
+        self.gameover = np.zeros(n, dtype=bool)
+
+#------------------------------------------------------------------------
+# Pieces: sources[i] is the PieceSource of game i (pieces.py)
+#------------------------------------------------------------------------
+    def piece_array(self, sources, length):
+        for source in sources:
+            source.generate(length)
+        return np.stack([np.frombuffer(source.sequence, dtype=np.uint8)[:length] for source in sources])
+
+    def play(self, weights, sources, max_pieces = None):
+        self.reset()
+        weights = np.asarray(weights, dtype=np.float64)
+        length = 1024 if max_pieces is None else max_pieces + 2
+        pieces = self.piece_array(sources, length)
+        idx = np.arange(self.n)
+        self.gameover = self.spawn_collides(idx, pieces[:, 0])
+        t = 0
+        while True:
+            running = ~self.gameover
+            if max_pieces is not None:
+                running &= self.placements < max_pieces
+            idx = np.flatnonzero(running)
+            if len(idx) == 0:
+                break
+            if t + 2 > pieces.shape[1]:
+                pieces = self.piece_array(sources, 2 * pieces.shape[1])
+            self.step(idx, weights[idx], pieces[idx, t], pieces[idx, t + 1])
+            t += 1
+        return self.score
+
+    def spawn_collides(self, idx, piece):
+        return ((self.rows[idx, :4] & self.table.masks[piece, 0]) != 0).any(axis=1)
+
+#------------------------------------------------------------------------
+# One stone for the games idx: returns (candidate index, landing row)
+#------------------------------------------------------------------------
+    def step(self, idx, weights, piece, next_piece):
+        table = self.table
+        height = self.height
+        board = self.rows[idx]
+        masks = table.masks[piece]
+
+        windows = board[:, self.windows]
+        collides = ((windows[:, None, :, :] & masks[:, :, None, :]) != 0).any(axis=3)
+        blocked = collides[:, :, 0] | ~table.valid[piece]
+        valid = ~(blocked[:, None, :] & table.needs[piece]).any(axis=2) & table.valid[piece]
+        landing = collides[:, :, 1:].argmax(axis=2)
+
+        cells = ((board[:, :height, None] >> np.arange(self.width)) & 1).astype(bool)
+        tops = np.where(cells.any(axis=1), cells.argmax(axis=1), height)
+        filled = cells.sum(axis=(1, 2))
+        full_rows = (board[:, :height] == self.full).sum(axis=1)
+
+        new_tops = np.minimum(tops[:, None, :], landing[:, :, None] + table.tops[piece])
+        heights = height - new_tops
+        aggregate_height = heights.sum(axis=2)
+        touched = np.take_along_axis(board[:, None, :], landing[:, :, None] + np.arange(4), axis=2)
+        complete_lines = full_rows[:, None] + (((touched | masks) == self.full) & (masks != 0)).sum(axis=2)
+        holes = aggregate_height - (filled[:, None] + 4)
+        bumpiness = np.abs(np.diff(heights, axis=2)).sum(axis=2)
+
+        scores = weights[:, 0, None] * aggregate_height
+        scores = scores + weights[:, 1, None] * complete_lines
+        scores = scores + weights[:, 2, None] * holes
+        scores = scores + weights[:, 3, None] * bumpiness
+        scores[~valid] = -np.inf
+        best = scores.argmax(axis=1)
+
+        k = np.arange(len(idx))
+        best_landing = landing[k, best]
+        rows_at = best_landing[:, None] + np.arange(4)
+        board[k[:, None], rows_at] |= masks[k, best]
+        self.score[idx] += best_landing + 1
+        self.placements[idx] += 1
+        self.gameover[idx] = ((board[:, :4] & table.masks[next_piece, 0]) != 0).any(axis=1)
+
+        full = board[:, :height] == self.full
+        cleared = full.sum(axis=1)
+        if cleared.any():
+            order = np.argsort(~full, axis=1, kind="stable")
+            kept = np.take_along_axis(board[:, :height], order, axis=1)
+            kept[np.arange(height)[None, :] < cleared[:, None]] = 0
+            board[:, :height] = kept
+        self.rows[idx] = board
+
+        lines = self.lines[idx] + cleared
+        level = self.level[idx]
+        self.score[idx] += linescores[cleared] * level
+        self.lines[idx] = lines
+        self.level[idx] = level + (lines >= level * 6)
+        return best, best_landing
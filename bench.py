@@ -0,0 +1,236 @@
+#------------------------------------------------------------------------
+# Benchmarks for the engine and AI hot paths
+# 1. Fixed inputs
+#	- Seeds for piece sequences and board fixtures
+#	- Board fixtures: empty, mid-game, tall + ragged
+#	- Genomes: the saved best_weights*.txt files
+# 2. Benchmarks
+#	- check_collision: us per call
+#	- Train.enumerate: us per call + us per candidate
+#	- Train.get_best_move: decisions/sec + us per candidate evaluation
+#	- Full game (GameEngine.play, capped): placements/sec
+#	- GA generation (evaluation.evaluate over a population): seconds
+#	- The same generation on the batched engine (evaluation.evaluate_batch)
+#	- Peak memory (tracemalloc) of a decision and of a game
+#	- Cold start: ms to import evaluation.py in a fresh interpreter
+# 3. Results are printed as JSON and can be saved as a baseline; a run
+#    against a baseline fails (exit code 1) when a metric regresses by
+#    more than the tolerance
+#
+# Run: python bench.py [--quick] [--json out.json] [--baseline base.json]
+#                      [--save-baseline base.json] [--tolerance 0.2]
+#------------------------------------------------------------------------
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from engine import GameEngine, check_collision, cols, new_board, rows, tetris_shapes
+from ai import Train
+from evaluation import EvalPolicy, evaluate, evaluate_batch
+from cli import load_weights
+
+fixture_seed = 7
+game_seed = 11
+genome_files = ["best_weights.txt", "best_weights5.txt", "best_weights10.txt"]
+
+def genomes():
+    here = os.path.dirname(os.path.abspath(__file__))
+    return [(name, load_weights(os.path.join(here, name))) for name in genome_files]
+
+#------------------------------------------------------------------------
+# Board fixtures, generated from a fixed seed
+#	- empty: a new board
+#	- mid_game: the bottom 8 rows filled, one gap per row + a few holes
+#	- tall_ragged: column heights between 10 and 18, holes scattered below
+#------------------------------------------------------------------------
+def fixtures():
+    rng = random.Random(fixture_seed)
+
+    mid_game = new_board()
+    for row in range(rows - 8, rows):
+        gap = rng.randrange(cols)
+        for col in range(cols):
+            mid_game[row][col] = 0 if col == gap or rng.random() < 0.1 else 1 + rng.randrange(7)
+
+    tall_ragged = new_board()
+    for col in range(cols):
+        height = rng.randint(10, 18)
+        for row in range(rows - height, rows):
+            tall_ragged[row][col] = 0 if rng.random() < 0.15 else 1 + rng.randrange(7)
+
+    return {"empty": new_board(), "mid_game": mid_game, "tall_ragged": tall_ragged}
+
+def per_call(fn, number, repeat = 3):
+    best = None
+    for r in range(repeat):
+        start = time.perf_counter()
+        for i in range(number):
+            fn()
+        elapsed = (time.perf_counter() - start) / number
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def peak_kib(fn):
+    tracemalloc.start()
+    fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+#------------------------------------------------------------------------
+# Benchmarks, each returns {metric: value}
+#	- metrics with _per_sec in their name are better when higher, the rest lower
+#------------------------------------------------------------------------
+def bench_check_collision(boards, number):
+    results = dict()
+    for name, board in boards.items():
+        def run():
+            for shape in tetris_shapes:
+                for y in range(0, rows, 4):
+                    check_collision(board, shape, (3, y))
+        calls = len(tetris_shapes) * len(range(0, rows, 4))
+        results["check_collision_us." + name] = per_call(run, number) / calls * 1e6
+    return results
+
+def bench_enumerate(boards, weights, number):
+    results = dict()
+    for name, board in boards.items():
+        train = Train(weights)
+        train.set_board(board, tetris_shapes[0])
+        (moves, states) = train.enumerate(train.begin_state)
+        seconds = per_call(lambda: train.enumerate(train.begin_state), number)
+        results["enumerate_us." + name] = seconds * 1e6
+        results["enumerate_us_per_candidate." + name] = seconds / len(states) * 1e6
+    return results
+
+def bench_get_best_move(boards, weights, number):
+    results = dict()
+    for name, board in boards.items():
+        seconds = 0.0
+        candidates = 0
+        for stone in tetris_shapes:
+            train = Train(weights)
+            train.set_board(board, stone)
+            candidates += len(train.candidates(board, stone))
+            seconds += per_call(train.get_best_move, number)
+        results["decisions_per_sec." + name] = len(tetris_shapes) / seconds
+        results["candidate_eval_us." + name] = seconds / candidates * 1e6
+        results["peak_kib.decision." + name] = peak_kib(train.get_best_move)
+    return results
+
+def bench_game(weights_list, max_pieces):
+    results = dict()
+    engine = GameEngine(bitboard=True)
+    for name, weights in weights_list:
+        start = time.perf_counter()
+        engine.play(Train(weights), seed=game_seed, max_pieces=max_pieces)
+        results["game_placements_per_sec." + name] = engine.placements / (time.perf_counter() - start)
+    name, weights = weights_list[0]
+    results["peak_kib.game"] = peak_kib(lambda: engine.play(Train(weights), seed=game_seed,
+                                                            max_pieces=max_pieces // 10))
+    return results
+
+def population(weights_list, pop_size):
+    rng = random.Random(fixture_seed)
+    pop = list()
+    while len(pop) < pop_size:
+        name, weights = weights_list[len(pop) % len(weights_list)]
+        pop.append([weight + rng.gauss(0, 0.1) for weight in weights])
+    return pop
+
+def bench_generation(weights_list, pop_size, max_pieces):
+    pop = population(weights_list, pop_size)
+    policy = EvalPolicy(max_pieces=max_pieces)
+    start = time.perf_counter()
+    placements = 0
+    for ind in pop:
+        fitness, n_placements = evaluate(ind, game_seed, policy=policy)
+        placements += n_placements
+    elapsed = time.perf_counter() - start
+    return {"generation_seconds": elapsed, "generation_placements_per_sec": placements / elapsed}
+
+def bench_batch_generation(weights_list, pop_size, max_pieces):
+    pop = population(weights_list, pop_size)
+    policy = EvalPolicy(max_pieces=max_pieces)
+    start = time.perf_counter()
+    results = evaluate_batch(pop, [game_seed] * len(pop), policy)
+    elapsed = time.perf_counter() - start
+    placements = sum(n_placements for fitness, n_placements in results)
+    return {"batch_generation_seconds": elapsed, "batch_generation_placements_per_sec": placements / elapsed}
+
+def bench_cold_start(repeat):
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = ("import time; start = time.perf_counter(); import evaluation; "
+            "print((time.perf_counter() - start) * 1000)")
+    times = list()
+    for r in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True)
+        times.append(float(output.stdout))
+    return {"evaluate_cold_start_ms": sorted(times)[len(times) // 2]}
+
+def run(quick = False):
+    boards = fixtures()
+    weights_list = genomes()
+    weights = weights_list[0][1]
+    number = 20 if quick else 200
+    results = dict()
+    results.update(bench_check_collision(boards, number))
+    results.update(bench_enumerate(boards, weights, number))
+    results.update(bench_get_best_move(boards, weights, number))
+    results.update(bench_game(weights_list, 500 if quick else 5000))
+    results.update(bench_generation(weights_list, 5 if quick else 25, 200 if quick else 1000))
+    results.update(bench_cold_start(3 if quick else 9))
+    results.update(bench_batch_generation(weights_list, 25 if quick else 250, 200 if quick else 1000))
+    return results
+
+#------------------------------------------------------------------------
+# Baseline comparison: returns [(metric, baseline, value)] of regressions
+#------------------------------------------------------------------------
+def regressions(results, baseline, tolerance):
+    worse = list()
+    for metric, value in sorted(results.items()):
+        if metric not in baseline:
+            continue
+        base = baseline[metric]
+        if "_per_sec" in metric:
+            regressed = value < base * (1 - tolerance)
+        else:
+            regressed = value > base * (1 + tolerance)
+        if regressed:
+            worse.append((metric, base, value))
+    return worse
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Benchmark the engine and AI hot paths")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations and shorter games")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against this baseline file")
+    parser.add_argument("--save-baseline", help="save the results as a baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.quick)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    print(output)
+    if args.json:
+        with open(args.json, "w") as file:
+            file.write(output + "\n")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            file.write(output + "\n")
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        worse = regressions(results, baseline, args.tolerance)
+        for metric, base, value in worse:
+            print("REGRESSION %s: %.3f -> %.3f" % (metric, base, value), file=sys.stderr)
+        return 1 if worse else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
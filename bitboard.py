@@ -0,0 +1,137 @@
+#------------------------------------------------------------------------
+# Bitboard backend for the Tetris well
+# 1. Each row is an int, bit x set = cell x filled (bit 0 = left column)
+# 2. The floor is one extra full row, like new_board()
+# 3. Piece masks are memoized per rotation matrix
+#	- Collision is a bitwise AND of the piece mask with the row
+#	- A full-line test is an equality check against the full row
+#	- A clone is a copy of one list of ints
+#------------------------------------------------------------------------
+_mask_cache = {}
+
+def shape_masks(shape):
+    key = tuple(map(tuple, shape))
+    masks = _mask_cache.get(key)
+    if masks is None:
+        masks = tuple(sum(1 << cx for cx, cell in enumerate(row) if cell) for row in shape)
+        _mask_cache[key] = masks
+    return masks
+
+def popcount(n):
+    return bin(n).count("1")
+
+class BitBoard:
+    __slots__ = ("rows", "width", "full")
+
+    def __init__(self, rows, width):
+        self.rows = rows
+        self.width = width
+        self.full = (1 << width) - 1
+
+    @staticmethod
+    def empty(width, height):
+        return BitBoard([0] * height + [(1 << width) - 1], width)
+
+    @staticmethod
+    def from_matrix(board):
+        rows = list()
+        for row in board:
+            rows.append(sum(1 << x for x, cell in enumerate(row) if cell))
+        return BitBoard(rows, len(board[0]))
+
+    def to_matrix(self):
+        return [[(row >> x) & 1 for x in range(self.width)] for row in self.rows]
+
+    def clone(self):
+        return BitBoard(self.rows[:], self.width)
+
+    def copy_from(self, other):
+        self.rows[:] = other.rows
+
+#------------------------------------------------------------------------
+# Mechanics on precomputed masks
+#	- collides: piece at (x, y) overlaps a filled cell, a wall or the floor
+#	- drop_row: lowest y the piece can reach straight down from y
+#	- place / remove: OR the piece into the rows, or clear it again, so a
+#	  scratch board can be used for place-score-undo without cloning
+#	- full_rows / clear_lines: equality test against the full row
+#------------------------------------------------------------------------
+    def collides(self, masks, x, y):
+        if x < 0 or y + len(masks) > len(self.rows):
+            return True
+        rows = self.rows
+        full = self.full
+        for i, mask in enumerate(masks):
+            mask <<= x
+            if mask > full or rows[y + i] & mask:
+                return True
+        return False
+
+    def drop_row(self, masks, x, y):
+        while not self.collides(masks, x, y + 1):
+            y += 1
+        return y
+
+    def place(self, masks, x, y):
+        rows = self.rows
+        for i, mask in enumerate(masks):
+            rows[y + i] |= mask << x
+
+    def remove(self, masks, x, y):
+        rows = self.rows
+        for i, mask in enumerate(masks):
+            rows[y + i] &= ~(mask << x)
+
+    def full_rows(self):
+        full = self.full
+        return [i for i, row in enumerate(self.rows[:-1]) if row == full]
+
+    def clear_lines(self):
+        full = self.full
+        kept = [row for row in self.rows[:-1] if row != full]
+        cleared = len(self.rows) - 1 - len(kept)
+        if cleared:
+            self.rows[:-1] = [0] * cleared + kept
+        return cleared
+
+#------------------------------------------------------------------------
+# Same signatures as check_collision / join_matrices in engine.py, so
+# callers can swap the backend without changing their drop logic
+#------------------------------------------------------------------------
+    def check_collision(self, shape, offset):
+        off_x, off_y = offset
+        return self.collides(shape_masks(shape), off_x, off_y)
+
+    def join_matrices(self, shape, offset):
+        off_x, off_y = offset
+        self.place(shape_masks(shape), off_x, off_y - 1)
+        return self
+
+#------------------------------------------------------------------------
+# Heuristic variables (see Train in ai.py), rows above the floor only
+#------------------------------------------------------------------------
+    def heights(self):
+        num_rows = len(self.rows) - 1
+        heights = [0] * self.width
+        seen = 0
+        for i, row in enumerate(self.rows[:-1]):
+            new = row & ~seen
+            if new:
+                for col in range(self.width):
+                    if (new >> col) & 1:
+                        heights[col] = num_rows - i
+                seen |= row
+                if seen == self.full:
+                    break
+        return heights
+
+    def complete_lines(self):
+        return len(self.full_rows())
+
+    def holes(self):
+        holes = 0
+        cover = 0
+        for row in self.rows[:-1]:
+            holes += popcount(cover & ~row)
+            cover |= row
+        return holes
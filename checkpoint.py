@@ -0,0 +1,34 @@
+#------------------------------------------------------------------------
+# Checkpoints for long GA runs (train.py)
+# 1. A checkpoint is one pickled dict (highest protocol), written to a
+#    temporary file, fsynced and renamed over the old one, so a crash
+#    while saving never leaves a truncated checkpoint behind
+# 2. train.py stores everything needed to continue bit-for-bit:
+#	- the generation counter, the population weights + valid fitnesses
+#	- best_ind / best_score, the cutoff threshold
+#	- the states of the random, numpy and game-seed RNGs
+# 3. truncate_lines drops per-generation output written after the last
+#    checkpoint, so a resumed run does not repeat lines
+#------------------------------------------------------------------------
+import os
+import pickle
+
+def save(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as file:
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp, path)
+
+def load(path):
+    with open(path, "rb") as file:
+        return pickle.load(file)
+
+def truncate_lines(path, n):
+    if not os.path.exists(path):
+        return
+    with open(path, "r") as file:
+        lines = file.readlines()[:n]
+    with open(path, "w") as file:
+        file.writelines(lines)
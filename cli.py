@@ -0,0 +1,117 @@
+#------------------------------------------------------------------------
+# One command line for everything:
+#	python cli.py play                      (keyboard game)
+#	python cli.py watch [weights]           (the AI plays, rendered)
+#	python cli.py train [--resume]          (Genetic Algorithm, train.py)
+#	python cli.py evaluate [weights]        (headless fitness of one genome)
+#	python cli.py bench [--quick] ...       (bench.py)
+#	python cli.py replay game.ttr [--seek N] (re-simulate a replay.py file)
+# 1. pygame / pyglet are imported by play + watch only, DEAP by train only,
+#    so evaluate starts without any GUI, audio or GA imports
+# 2. evaluate reports how long importing the evaluation code took and
+#    fails (exit code 1) when it exceeds evaluation.cold_start_budget_ms
+# 3. Weights files hold one Python list per file (best_weights*.txt)
+#------------------------------------------------------------------------
+import argparse
+import ast
+import sys
+import time
+
+default_weights = "best_weights.txt"
+
+def load_weights(path):
+    file = open(path, "r")
+    weights = ast.literal_eval(file.readline())
+    file.close()
+    return [float(data) for data in weights]
+
+def play(args):
+    from tetris import TetrisApp
+    TetrisApp().run()
+
+def watch(args):
+    from tetris import TetrisApp, unlimited
+    per_frame = unlimited if args.unlimited else args.per_frame
+    app = TetrisApp(watch_delay=args.watch_delay, bitboard=args.bitboard, profile_path=args.profile,
+                    per_frame=per_frame, skip_to=args.skip_to, replay_dir=args.replay_dir)
+    app.run_train(load_weights(args.weights))
+
+def train(args, rest):
+    import train
+    train.main(rest)
+
+def evaluate(args):
+    start = time.perf_counter()
+    import evaluation
+    cold_start_ms = (time.perf_counter() - start) * 1000
+    policy = evaluation.EvalPolicy(max_pieces=args.max_pieces, n_games=args.games, aggregate=args.aggregate)
+    start = time.perf_counter()
+    fitness, placements = evaluation.evaluate(load_weights(args.weights), args.seed, policy=policy)
+    elapsed = time.perf_counter() - start
+    print("Fitness: %s" % fitness)
+    print("Placements: %d (%.1f/sec)" % (placements, placements / elapsed if elapsed > 0 else 0.0))
+    print("Cold start: %.1f ms (budget %d ms)" % (cold_start_ms, evaluation.cold_start_budget_ms))
+    return 1 if cold_start_ms > evaluation.cold_start_budget_ms else 0
+
+def replay(args):
+    from replay import Replay
+    game = Replay(args.file)
+    start = time.perf_counter()
+    engine = game.seek(args.seek)
+    elapsed = time.perf_counter() - start
+    print("Placements: %d of %d (%.1f ms)" % (engine.placements, len(game), elapsed * 1000))
+    print("Score: %d\nLevel: %d\nLines: %d" % (engine.score, engine.level, engine.lines))
+    return 0
+
+def bench(args, rest):
+    import bench
+    return bench.main(rest)
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Tetris: play, watch the AI, train, evaluate or benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("play", help="play with the keyboard")
+
+    parser_watch = commands.add_parser("watch", help="watch the AI play")
+    parser_watch.add_argument("weights", nargs="?", default=default_weights)
+    parser_watch.add_argument("--watch-delay", type=int, default=100, help="ms per stone (0 = one per frame)")
+    parser_watch.add_argument("--per-frame", type=int, default=None, help="stones per rendered frame")
+    parser_watch.add_argument("--unlimited", action="store_true", help="as fast as possible, frames at 60 fps")
+    parser_watch.add_argument("--skip-to", type=int, default=0, help="play this many stones before rendering")
+    parser_watch.add_argument("--bitboard", action="store_true")
+    parser_watch.add_argument("--profile", help="write phase timings to this file")
+    parser_watch.add_argument("--replay-dir", help="record every game to this directory")
+
+    commands.add_parser("train", help="train weights (train.py options follow)", add_help=False)
+
+    parser_evaluate = commands.add_parser("evaluate", help="headless fitness of one genome")
+    parser_evaluate.add_argument("weights", nargs="?", default=default_weights)
+    parser_evaluate.add_argument("--seed", type=int, default=1)
+    parser_evaluate.add_argument("--max-pieces", type=int, default=10000)
+    parser_evaluate.add_argument("--games", type=int, default=1)
+    parser_evaluate.add_argument("--aggregate", choices=("mean", "median"), default="mean")
+
+    commands.add_parser("bench", help="benchmarks (bench.py options follow)", add_help=False)
+
+    parser_replay = commands.add_parser("replay", help="re-simulate a recorded game")
+    parser_replay.add_argument("file")
+    parser_replay.add_argument("--seek", type=int, default=None, help="stop after this many placements")
+
+    args, rest = parser.parse_known_args(argv)
+    if args.command == "train":
+        return train(args, rest)
+    if args.command == "bench":
+        return bench(args, rest)
+    if rest:
+        parser.error("unrecognized arguments: " + " ".join(rest))
+    if args.command == "play":
+        return play(args)
+    if args.command == "watch":
+        return watch(args)
+    if args.command == "replay":
+        return replay(args)
+    return evaluate(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+import pytest
+
+from engine import new_board, rows
+
+#------------------------------------------------------------------------
+# Shared test fixtures
+#	- weights: one fixed, well-playing weight vector (4 heuristics)
+#	- random_board(rng, max_height = rows - 2): a list board with random
+#	  cells (overhangs and holes included) in its bottom rows
+#------------------------------------------------------------------------
+@pytest.fixture
+def weights():
+    return [-0.510066, 0.760666, -0.35663, -0.184483]
+
+@pytest.fixture
+def random_board():
+    def make(rng, max_height = rows - 2):
+        board = new_board()
+        height = rng.randrange(max_height)
+        density = rng.random()
+        for y in range(rows - height, rows):
+            for x in range(len(board[0])):
+                board[y][x] = 1 if rng.random() < density else 0
+        return board
+    return make
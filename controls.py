@@ -0,0 +1,60 @@
+#------------------------------------------------------------------------
+# Keyboard handling for human play (tetris.py), no pygame imports
+# 1. AutoRepeat: DAS / ARR instead of the OS key repeat
+#	- A held repeatable key fires once on press, again after das ms
+#	  (delayed auto shift), then every arr ms (auto repeat rate)
+#	- Keys that are not repeatable (rotate, hard drop, ...) fire once
+# 2. LatencyStats: time from handling a key press to the end of the next
+#    rendered frame, kept for the last `window` presses, as percentiles
+#------------------------------------------------------------------------
+from collections import deque
+
+class AutoRepeat:
+    __slots__ = ("das", "arr", "due")
+
+    def __init__(self, das, arr):
+        self.das = das
+        self.arr = arr
+        self.due = dict()
+
+    def press(self, key, now):
+        self.due[key] = now + self.das
+
+    def release(self, key):
+        self.due.pop(key, None)
+
+    def clear(self):
+        self.due.clear()
+
+#------------------------------------------------------------------------
+# Returns the keys to fire at time now (a key once per elapsed repeat)
+#------------------------------------------------------------------------
+    def repeats(self, now):
+        fired = list()
+        for key, due in self.due.items():
+            while due <= now:
+                fired.append(key)
+                due += self.arr
+            self.due[key] = due
+        return fired
+
+class LatencyStats:
+    __slots__ = ("samples", "pending")
+
+    def __init__(self, window = 500):
+        self.samples = deque(maxlen=window)
+        self.pending = list()
+
+    def input(self, now):
+        self.pending.append(now)
+
+    def frame(self, now):
+        for start in self.pending:
+            self.samples.append(now - start)
+        self.pending.clear()
+
+    def percentiles(self, ranks = (50, 90, 99)):
+        if not self.samples:
+            return [0.0] * len(ranks)
+        ordered = sorted(self.samples)
+        return [ordered[min(len(ordered) - 1, len(ordered) * rank // 100)] for rank in ranks]
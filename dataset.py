@@ -0,0 +1,134 @@
+#------------------------------------------------------------------------
+# Decision dataset export (Train(weights, exporter=DecisionExporter(dir)))
+# 1. Every decision appends one row to a chunk of preallocated .npy files
+#    (numpy.lib.format.open_memmap), chunk_size rows per chunk:
+#	- boards_<chunk>.npy   (chunk_size, rows) uint16, packed row masks
+#	  above the floor (bit x = column x), see board_cells
+#	- stones_<chunk>.npy   (chunk_size,) uint8, the stone's color (1..7)
+#	- features_<chunk>.npy (chunk_size, max_candidates, 4) int16, features
+#	  of every candidate (aggregate height, complete lines, holes, bumpiness)
+#	- counts_<chunk>.npy   (chunk_size,) uint8, candidates per decision
+#	- chosen_<chunk>.npy   (chunk_size,) uint8, index of the chosen candidate
+# 2. Memory is bounded: only the current chunk is mapped, the OS writes it
+#    back; rows are filled in order and counts = 0 marks unused rows
+#	- Decisions are buffered in Python lists (up to `buffer` of them) and
+#	  written to the chunk with one NumPy conversion per field
+# 3. sample = k records every k-th decision only
+# 4. chunks() memory-maps the files back (zero-copy, unused rows cut off),
+#    load() concatenates every chunk into one dict of arrays
+#------------------------------------------------------------------------
+import glob
+import os
+from itertools import chain
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from engine import cols, rows, tetris_shapes
+from placements import rotations
+
+fields = ("boards", "stones", "features", "counts", "chosen")
+
+def max_candidates(num_cols = cols):
+    return max(sum(num_cols - rotation.width + 1 for rotation in rotations(stone) if rotation.unique)
+               for stone in tetris_shapes)
+
+class DecisionExporter:
+    def __init__(self, directory, chunk_size = 1 << 16, sample = 1, buffer = 1024,
+                 num_cols = cols, num_rows = rows):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.sample = sample
+        self.buffer = min(buffer, chunk_size)
+        self.pending = ([], [], [], [], [])
+        self.num_rows = num_rows
+        self.width = max_candidates(num_cols)
+        self.decisions = 0
+        self.chunk = len(glob.glob(os.path.join(directory, "counts_*.npy")))
+        self.arrays = None
+        self.n = chunk_size
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, field, chunk):
+        return os.path.join(self.directory, "%s_%06d.npy" % (field, chunk))
+
+    def next_chunk(self):
+        self.close_chunk()
+        size = self.chunk_size
+        shapes = {
+            "boards": ((size, self.num_rows), np.uint16),
+            "stones": ((size,), np.uint8),
+            "features": ((size, self.width, 4), np.int16),
+            "counts": ((size,), np.uint8),
+            "chosen": ((size,), np.uint8),
+        }
+        self.arrays = [open_memmap(self.path(field, self.chunk), mode="w+", dtype=shapes[field][1],
+                                   shape=shapes[field][0]) for field in fields]
+        self.chunk += 1
+        self.n = 0
+
+#------------------------------------------------------------------------
+# rows: row masks above the floor (features.row_masks), features: one
+# 4-tuple per candidate in enumeration order
+#------------------------------------------------------------------------
+    def record(self, board_rows, stone, features, chosen):
+        self.decisions += 1
+        if self.sample > 1 and self.decisions % self.sample:
+            return
+        boards, stones, candidate_features, counts, chosen_index = self.pending
+        boards.extend(board_rows)
+        stones.append(max(stone[0]))
+        candidate_features.append(features)
+        counts.append(len(features))
+        chosen_index.append(chosen)
+        if len(chosen_index) >= self.buffer or self.n + len(chosen_index) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        boards, stones, candidate_features, counts, chosen_index = self.pending
+        k = len(chosen_index)
+        if k == 0:
+            return
+        if self.n == self.chunk_size:
+            self.next_chunk()
+        i = self.n
+        out_boards, out_stones, out_features, out_counts, out_chosen = self.arrays
+        out_boards[i:i + k] = np.array(boards, dtype=np.uint16).reshape(k, self.num_rows)
+        out_stones[i:i + k] = stones
+        out_chosen[i:i + k] = chosen_index
+        lengths = np.array(counts)
+        out_counts[i:i + k] = lengths
+        rows_at = np.repeat(np.arange(i, i + k), lengths)
+        columns_at = np.arange(len(rows_at)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        out_features[rows_at, columns_at] = np.array(list(chain.from_iterable(candidate_features)),
+                                                     dtype=np.int16).reshape(-1, 4)
+        self.n += k
+        for pending in self.pending:
+            pending.clear()
+
+    def close_chunk(self):
+        if self.arrays is not None:
+            for array in self.arrays:
+                array.flush()
+            self.arrays = None
+
+    def close(self):
+        self.flush()
+        self.close_chunk()
+
+def chunks(directory):
+    for counts_path in sorted(glob.glob(os.path.join(directory, "counts_*.npy"))):
+        suffix = counts_path[len(os.path.join(directory, "counts")):]
+        arrays = {field: np.load(os.path.join(directory, field + suffix), mmap_mode="r") for field in fields}
+        used = arrays["counts"] != 0
+        n = len(used) if used.all() else int(used.argmin())
+        yield {field: array[:n] for field, array in arrays.items()}
+
+def load(directory):
+    parts = list(chunks(directory))
+    if not parts:
+        return {}
+    return {field: np.concatenate([part[field] for part in parts]) for field in fields}
+
+def board_cells(boards, num_cols = cols):
+    return ((boards[..., None] >> np.arange(num_cols)) & 1).astype(bool)
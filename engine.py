@@ -0,0 +1,312 @@
+#------------------------------------------------------------------------
+# Headless Tetris engine (no pygame / pyglet imports)
+# 1. The Tetris grid is 10 cells wide and 22 cells tall, with the top 2 rows hidden.
+# 2. The engine owns the board, the piece queue, line clears and scoring.
+# 3. TetrisApp (tetris.py) renders on top of it, train.py drives it directly.
+#------------------------------------------------------------------------
+import time
+from enum import Enum
+from bitboard import BitBoard, shape_masks
+from pieces import PieceSource
+
+#------------------------------------------------------------------------
+# 1. Basic Configuration
+# 2. Pieces
+#		- 1 [T-Piece], 2 [S-Piece], 3 [Z-Piece], 4 [J-Piece]
+#		- 5 [L-Piece], 6 [I-Piece], 7 [O-Piece]
+#------------------------------------------------------------------------
+cols =		10
+rows =		22
+
+tetris_shapes = [
+	[[1, 1, 1],
+	 [0, 1, 0]],
+
+	[[0, 2, 2],
+	 [2, 2, 0]],
+
+	[[3, 3, 0],
+	 [0, 3, 3]],
+
+	[[4, 0, 0],
+	 [4, 4, 4]],
+
+	[[0, 0, 5],
+	 [5, 5, 5]],
+
+	[[6, 6, 6, 6]],
+
+	[[7, 7],
+	 [7, 7]]
+]
+
+#------------------------------------------------------------------------
+# This section contains the following mechanics:
+#   1. Rotation
+#   2. Collision Check
+#   3. Row Clear
+#   4. Join Matrices
+#   5. New Board
+#------------------------------------------------------------------------
+def rotate_clockwise(shape):
+	return [ [ shape[y][x]
+			for y in range(len(shape)) ]
+		for x in range(len(shape[0]) - 1, -1, -1) ]
+
+def check_collision(board, shape, offset):
+	off_x, off_y = offset
+	for cy, row in enumerate(shape):
+		for cx, cell in enumerate(row):
+			try:
+				if cell and board[ cy + off_y ][ cx + off_x ]:
+					return True
+			except IndexError:
+				return True
+	return False
+
+def remove_row(board, row):
+	del board[row]
+	return [[0 for i in range(cols)]] + board
+
+def join_matrices(mat1, mat2, mat2_off):
+	off_x, off_y = mat2_off
+	for cy, row in enumerate(mat2):
+		for cx, val in enumerate(row):
+			mat1[cy+off_y-1	][cx+off_x] += val
+	return mat1
+
+def new_board():
+	board = [ [ 0 for x in range(cols) ]
+				  for y in range(rows) ]
+	board += [[ 1 for x in range(cols)]]
+	return board
+
+class Moves(Enum):
+    LEFT  = 1
+    RIGHT = 2
+    DROP  = 3
+    ROT   = 4
+
+#------------------------------------------------------------------------
+# This sections contains the game state mechanics:
+# a. Incoming tetromino
+#	- Pieces come from a seeded PieceSource ("bag" = 7 system, or "uniform")
+# b. New game
+# c. Clearing lines + scoring
+# d. Movement
+# e. Drop
+# f. Hard drop
+# g. Rotations
+# h. Bitboard mode: collisions + line clears also run on a BitBoard mirror
+#	of the (colored) list board, which is kept for rendering
+# i. Playing a game with an AI (anything with set_board + get_best_move)
+#	- A seed (or a shared PieceSource, see pieces.py) makes the piece
+#	  sequence of that game reproducible
+#	- Evaluation mode: no frame-rate throttling, runs as fast as the CPU allows
+#	- max_pieces ends the game early after that many placements
+#	- placements_per_sec() reports the speed of the current/last game
+#	- step() places one stone; with a profiler (profiler.py) it records the
+#	  engine_step + drop phases
+# j. A recorder (replay.py) is told the (rotation, x) of every placement;
+#	snapshot() / restore() save and load the whole game state
+#------------------------------------------------------------------------
+class GameEngine(object):
+	def __init__(self, bitboard = False, seed = None, mode = "bag"):
+		self.bitboard = bitboard
+		self.mode = mode
+		self.profiler = None
+		self.recorder = None
+		self.set_pieces(PieceSource(seed, mode))
+		self.gameover = False
+		self.paused = False
+		self.init_game()
+
+	def new_stone(self):
+		self.stone = self.next_stone[:]
+		self.next_stone = tetris_shapes[self.pieces.next_piece()]
+		self.stone_x = int(cols / 2 - len(self.stone[0])/2)
+		self.stone_y = 0
+		self.stone_rotation = 0
+		if self.collides(self.stone, (self.stone_x, self.stone_y)):
+			self.gameover = True
+			self.end_time = time.perf_counter()
+
+	def init_game(self):
+		self.board = new_board()
+		self.bits = BitBoard.from_matrix(self.board) if self.bitboard else None
+		self.new_stone()
+		self.level = 1
+		self.score = 0
+		self.lines = 0
+		self.delay = 1000
+		self.placements = 0
+		self.start_time = time.perf_counter()
+		self.end_time = None
+
+	def placements_per_sec(self):
+		end_time = self.end_time if self.end_time is not None else time.perf_counter()
+		elapsed = end_time - self.start_time
+		return self.placements / elapsed if elapsed > 0 else 0.0
+
+	def collides(self, shape, offset):
+		if self.bits is not None:
+			return self.bits.check_collision(shape, offset)
+		return check_collision(self.board, shape, offset)
+
+#---------------------------------------------------------------------------
+# Original BPS scoring system (Line Clear Points)
+#	- single: 40
+#	- double: 100
+#	- triple: 300
+#	- tetris: 1200
+# The gravity delay (ms) shrinks with every level, down to 100 ms.
+#---------------------------------------------------------------------------
+	def add_cl_lines(self, n):
+		linescores = [0, 40, 100, 300, 1200]
+		self.lines += n
+		self.score += linescores[n] * self.level
+		if self.lines >= self.level*6:
+			self.level += 1
+			newdelay = 1000-50*(self.level-1)
+			self.delay = 100 if newdelay < 100 else newdelay
+
+	def move(self, delta_x):
+		if not self.gameover and not self.paused:
+			new_x = self.stone_x + delta_x
+			if new_x < 0:
+				new_x = 0
+			if new_x > cols - len(self.stone[0]):
+				new_x = cols - len(self.stone[0])
+			if not self.collides(self.stone, (new_x, self.stone_y)):
+				self.stone_x = new_x
+
+	def drop(self, manual):
+		if not self.gameover and not self.paused:
+			self.score += 1 if manual else 0
+			self.stone_y += 1
+			if self.collides(self.stone, (self.stone_x, self.stone_y)):
+				self.lock()
+				return True
+		return False
+
+	def lock(self):
+		rotation, x = self.stone_rotation, self.stone_x
+		self.board = join_matrices(self.board,
+								   self.stone,
+								  (self.stone_x, self.stone_y))
+		if self.bits is not None:
+			self.bits.join_matrices(self.stone, (self.stone_x, self.stone_y))
+		self.placements += 1
+		self.new_stone()
+		if self.bits is not None:
+			for i in self.bits.full_rows():
+				self.board = remove_row(self.board, i)
+			cleared_rows = self.bits.clear_lines()
+		else:
+			cleared_rows = 0
+			while True:
+				for i, row in enumerate(self.board[:-1]):
+					if 0 not in row:
+						self.board = remove_row(self.board, i)
+						cleared_rows += 1
+						break
+				else:
+					break
+		self.add_cl_lines(cleared_rows)
+		if self.recorder is not None:
+			self.recorder.placement(self, rotation, x)
+
+	def insta_drop(self):
+		if not self.gameover and not self.paused:
+			if self.bits is not None:
+				landing = self.bits.drop_row(shape_masks(self.stone), self.stone_x, self.stone_y)
+				self.score += landing + 1 - self.stone_y
+				self.stone_y = landing + 1
+				self.lock()
+				return
+			while(not self.drop(True)):
+				pass
+
+	def rotate_stone(self):
+		if not self.gameover and not self.paused:
+			new_stone = rotate_clockwise(self.stone)
+			if not self.collides(new_stone, (self.stone_x, self.stone_y)):
+				self.stone = new_stone
+				self.stone_rotation = (self.stone_rotation + 1) % 4
+
+	def actions(self):
+		return {
+			Moves.LEFT:  lambda:self.move(-1),
+			Moves.RIGHT: lambda:self.move(1),
+			Moves.DROP:  self.insta_drop,
+			Moves.ROT:   self.rotate_stone
+		}
+
+	def snapshot(self):
+		return {
+			"board": [row[:] for row in self.board],
+			"stone": [row[:] for row in self.stone],
+			"next_stone": [row[:] for row in self.next_stone],
+			"stone_x": self.stone_x,
+			"stone_y": self.stone_y,
+			"stone_rotation": self.stone_rotation,
+			"score": self.score,
+			"lines": self.lines,
+			"level": self.level,
+			"delay": self.delay,
+			"placements": self.placements,
+			"gameover": self.gameover,
+			"pos": self.pieces.pos
+		}
+
+	def restore(self, state):
+		self.board = [row[:] for row in state["board"]]
+		self.bits = BitBoard.from_matrix(self.board) if self.bitboard else None
+		self.stone = [row[:] for row in state["stone"]]
+		self.next_stone = [row[:] for row in state["next_stone"]]
+		self.stone_x = state["stone_x"]
+		self.stone_y = state["stone_y"]
+		self.stone_rotation = state["stone_rotation"]
+		self.score = state["score"]
+		self.lines = state["lines"]
+		self.level = state["level"]
+		self.delay = state["delay"]
+		self.placements = state["placements"]
+		self.gameover = state["gameover"]
+		self.pieces.pos = state["pos"]
+
+	def set_pieces(self, pieces):
+		self.pieces = pieces
+		self.next_stone = tetris_shapes[self.pieces.next_piece()]
+
+	def play(self, train, seed = None, pieces = None, max_pieces = None):
+		train_actions = self.actions()
+		if pieces is not None:
+			self.set_pieces(pieces)
+		elif seed is not None:
+			self.set_pieces(PieceSource(seed, self.mode))
+		self.init_game()
+		self.gameover = False
+		self.paused = False
+
+		while not self.gameover:
+			if max_pieces is not None and self.placements >= max_pieces:
+				self.end_time = time.perf_counter()
+				break
+			self.step(train, train_actions)
+		return self.score
+
+	def step(self, train, train_actions):
+		profiler = self.profiler
+		if profiler is None:
+			train.set_board(self.bits if self.bits is not None else self.board, self.stone, self.next_stone)
+			for move in train.get_best_move():
+				train_actions[move]()
+			return
+		start = time.perf_counter()
+		train.set_board(self.bits if self.bits is not None else self.board, self.stone, self.next_stone)
+		profiler.add("engine_step", time.perf_counter() - start)
+		for move in train.get_best_move():
+			start = time.perf_counter()
+			train_actions[move]()
+			profiler.add("drop" if move == Moves.DROP else "engine_step", time.perf_counter() - start)
@@ -0,0 +1,281 @@
+#------------------------------------------------------------------------
+# Fitness evaluation for the Genetic Algorithm (train.py)
+# 1. evaluate: plays seeded headless games with the given weights
+#	- Each process keeps one GameEngine and reuses it for every game
+#	- Returns (fitness, placements)
+#	- The seed picks the PieceSources (7-bag); sequences are kept per process,
+#	  so individuals evaluated with the same seed play the same pieces
+#	  (common random numbers) without regenerating them
+# 2. EvalPolicy: bounded, predictable cost per individual
+#	- max_pieces: a game ends after that many placements (None = game over)
+#	- n_games: games per individual, aggregated by "mean" or "median"
+#	- With a threshold, the remaining games are skipped as soon as the
+#	  individual can no longer reach it
+#	- cache_entries > 0: every individual in a process shares one LRU
+#	  TranspositionCache of candidate features (cache.py), bounded to
+#	  cache_entries and to cache.default_max_bytes
+#	- profile_dir (created if missing): every process keeps one
+#	  PhaseProfiler (profiler.py) and rewrites profile_dir/phases_<pid>.json
+#	  after each evaluation; cprofile=True also dumps a cProfile (pstats)
+#	  file per evaluation
+#	- export_dir: every decision is appended to a dataset (dataset.py) in
+#	  export_dir/<pid>, export_sample = k keeps every k-th decision;
+#	  buffered decisions are written after each evaluation
+# 3. evaluate_batch: every game of a whole population at once, in lockstep
+#    on the NumPy BatchEngine (batchengine.py); same fitnesses as evaluate
+#    without a threshold (every game is played)
+# 4. FitnessCache: results keyed on (fitness_version, piece_mode, weights,
+#    seed, threshold, policy)
+#	- With a path, results are appended to a JSON lines file and loaded
+#	  again by the next run, so re-evaluations across runs are free
+#	- Bump fitness_version whenever the engine, the AI or the scoring
+#	  changes, older results then no longer match any key
+#	- A record cut off by a killed run (no final newline) is dropped and
+#	  truncated away before new records are appended
+# 5. record_games: plays the games of evaluate again (every game, no
+#    threshold) and keeps each one as a replay (replay.py), used for the
+#    champions of train.py / islands.py --replay-dir
+# 6. make_map: the map used by toolbox.map
+#	- n_workers <= 1: the builtin (serial) map
+#	- otherwise: a process pool map, results come back in input order
+#	- Games are seeded per individual, so both give identical results
+# NumPy, json, the process pool and the batched engine are imported when
+# first used, so a fresh worker can import
+# this module and evaluate within cold_start_budget_ms (see cli.py)
+#------------------------------------------------------------------------
+import cProfile
+import os
+import random
+
+from engine import GameEngine, cols, rows
+from ai import Train
+from pieces import PieceSource
+from cache import TranspositionCache
+from profiler import PhaseProfiler
+
+max_sources = 8
+piece_mode = "bag"
+fitness_version = 1
+cold_start_budget_ms = 100
+_engine = None
+_cache = None
+_sources = {}
+_profiler = None
+_profile_dir = None
+_exporter = None
+_evaluations = 0
+_json = None
+
+def piece_source(seed):
+    source = _sources.get(seed)
+    if source is None:
+        if len(_sources) >= max_sources:
+            _sources.pop(next(iter(_sources)))
+        source = PieceSource(seed, piece_mode)
+        _sources[seed] = source
+    return source.copy()
+
+#------------------------------------------------------------------------
+# Upper bound on the score of a game of max_pieces placements
+#	- hard drop points: at most one per row per placement
+#	- every placement adds 4 cells, so at most 4 * max_pieces / cols lines
+#	- a line is worth at most 300 * level (a tetris), and the level while
+#	  clearing line i is at most 1 + i // 6 (see add_cl_lines)
+#------------------------------------------------------------------------
+def max_game_score(max_pieces):
+    score = rows * max_pieces
+    for line in range(4 * max_pieces // cols):
+        score += 300 * (1 + line // 6)
+    return score
+
+class EvalPolicy:
+    def __init__(self, max_pieces = None, n_games = 1, aggregate = "mean", cache_entries = 0,
+                 profile_dir = None, cprofile = False, export_dir = None, export_sample = 1):
+        if aggregate not in ("mean", "median"):
+            raise ValueError("unknown aggregate: %r" % (aggregate,))
+        self.max_pieces = max_pieces
+        self.n_games = n_games
+        self.aggregate = aggregate
+        self.cache_entries = cache_entries
+        self.profile_dir = profile_dir
+        self.cprofile = cprofile
+        self.export_dir = export_dir
+        self.export_sample = export_sample
+
+    def key(self):
+        return [self.max_pieces, self.n_games, self.aggregate]
+
+    def game_seeds(self, seed):
+        if self.n_games == 1:
+            return [seed]
+        rng = random.Random(seed)
+        return [rng.randrange(2**32) for game in range(self.n_games)]
+
+    def fitness(self, scores):
+        if self.aggregate == "median":
+            ordered = sorted(scores)
+            middle = len(ordered) // 2
+            if len(ordered) % 2:
+                return float(ordered[middle])
+            return (ordered[middle - 1] + ordered[middle]) / 2
+        return sum(scores) / len(scores)
+
+    def cut_off(self, scores, threshold):
+        remaining = self.n_games - len(scores)
+        if threshold is None or remaining == 0:
+            return False
+        if self.aggregate == "median":
+            below = sum(1 for score in scores if score < threshold)
+            return below > self.n_games // 2
+        if self.max_pieces is None:
+            return False
+        best = sum(scores) + remaining * max_game_score(self.max_pieces)
+        return best / self.n_games < threshold
+
+def shared_cache(max_entries):
+    global _cache
+    if _cache is None or _cache.max_entries != max_entries:
+        _cache = TranspositionCache(max_entries)
+    return _cache
+
+def decision_exporter(policy):
+    global _exporter
+    if policy.export_dir is None:
+        return None
+    if _exporter is None:
+        from dataset import DecisionExporter
+        _exporter = DecisionExporter(os.path.join(policy.export_dir, str(os.getpid())), sample=policy.export_sample)
+    return _exporter
+
+def phase_profiler(policy):
+    global _profiler, _profile_dir
+    if policy.profile_dir is None:
+        return None
+    if _profile_dir != policy.profile_dir:
+        os.makedirs(policy.profile_dir, exist_ok=True)
+        _profile_dir = policy.profile_dir
+    if _profiler is None:
+        _profiler = PhaseProfiler()
+    return _profiler
+
+def evaluate(weights, seed, threshold = None, policy = EvalPolicy()):
+    global _engine, _evaluations
+    if _engine is None:
+        _engine = GameEngine(bitboard=True)
+    cache = shared_cache(policy.cache_entries) if policy.cache_entries > 0 else None
+    profiler = phase_profiler(policy)
+    _engine.profiler = profiler
+    exporter = decision_exporter(policy)
+    train = Train(list(weights), cache=cache, profiler=profiler, exporter=exporter)
+    _evaluations += 1
+    stats = cProfile.Profile() if policy.profile_dir is not None and policy.cprofile else None
+    if stats is not None:
+        stats.enable()
+    scores = list()
+    placements = 0
+    for game_seed in policy.game_seeds(seed):
+        scores.append(_engine.play(train, pieces=piece_source(game_seed), max_pieces=policy.max_pieces))
+        placements += _engine.placements
+        if policy.cut_off(scores, threshold):
+            break
+    if stats is not None:
+        stats.disable()
+        stats.dump_stats(os.path.join(policy.profile_dir, "eval_%d_%d.pstats" % (os.getpid(), _evaluations)))
+    if profiler is not None:
+        profiler.export(os.path.join(policy.profile_dir, "phases_%d.json" % os.getpid()))
+    if exporter is not None:
+        exporter.flush()
+    return (policy.fitness(scores), placements)
+
+def record_games(weights, seed, prefix, policy = EvalPolicy()):
+    import replay
+    engine = GameEngine(bitboard=True, mode=piece_mode)
+    scores = list()
+    for i, game_seed in enumerate(policy.game_seeds(seed)):
+        recorder = replay.record(engine, "%s_%d.ttr" % (prefix, i), seed=game_seed)
+        scores.append(engine.play(Train(list(weights)), max_pieces=policy.max_pieces))
+        recorder.close()
+        engine.recorder = None
+    return scores
+
+def evaluate_batch(population, seeds, policy = EvalPolicy()):
+    from batchengine import BatchEngine
+    weights = list()
+    sources = list()
+    for ind, seed in zip(population, seeds):
+        for game_seed in policy.game_seeds(seed):
+            weights.append(list(ind))
+            sources.append(piece_source(game_seed))
+    if not weights:
+        return []
+    engine = BatchEngine(len(weights))
+    scores = engine.play(weights, sources, max_pieces=policy.max_pieces).tolist()
+    placements = engine.placements.tolist()
+    results = list()
+    for i in range(0, len(weights), policy.n_games):
+        results.append((policy.fitness(scores[i:i + policy.n_games]), sum(placements[i:i + policy.n_games])))
+    return results
+
+def json_module():
+    global _json
+    if _json is None:
+        import json
+        _json = json
+    return _json
+
+class FitnessCache:
+    def __init__(self, path = None):
+        self.path = path
+        self.results = dict()
+        self.hits = 0
+        self.misses = 0
+        self.file = None
+        if path is not None:
+            if os.path.exists(path):
+                self.load(path)
+            self.file = open(path, "a")
+
+    def load(self, path):
+        json = json_module()
+        with open(path, "rb+") as file:
+            data = file.read()
+            complete = data.rfind(b"\n") + 1
+            for line in data[:complete].splitlines():
+                record = json.loads(line)
+                self.results[record["key"]] = tuple(record["result"])
+            if complete < len(data):
+                file.truncate(complete)
+
+    @staticmethod
+    def key(weights, seed, threshold, policy):
+        return json_module().dumps([fitness_version, piece_mode, list(weights), seed, threshold, policy.key()])
+
+    def get(self, key):
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key, result):
+        self.results[key] = result
+        if self.file is not None:
+            self.file.write(json_module().dumps({"key": key, "result": list(result)}) + "\n")
+            self.file.flush()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+def make_map(n_workers):
+    if n_workers <= 1:
+        return map, None
+    from concurrent.futures import ProcessPoolExecutor
+    executor = ProcessPoolExecutor(max_workers=n_workers)
+    return executor.map, executor
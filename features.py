@@ -0,0 +1,105 @@
+#------------------------------------------------------------------------
+# Heuristic feature extraction
+# 1. One pass over the row masks of a board computes every feature:
+#	- aggregate height, complete lines, holes, and bumpiness (slope)
+# 2. A placed stone only changes the columns it touches, so the features
+#    of a candidate board are updated from its parent board:
+#	- heights: the touched columns grow to the stone's top cell
+#	- holes: the empty cells between the stone and the old column top
+#	- complete lines: only the rows the stone covers can become full
+#	- bumpiness: only the column pairs next to the stone change
+# 3. Feature vectors are scored with a dot product against the weights
+#------------------------------------------------------------------------
+from bitboard import BitBoard, popcount
+
+def row_masks(board):
+    if isinstance(board, BitBoard):
+        return board.rows[:-1]
+    rows = list()
+    for row in board[:-1]:
+        rows.append(sum(1 << x for x, cell in enumerate(row) if cell))
+    return rows
+
+def score(weights, features):
+    return sum(weight * feature for weight, feature in zip(weights, features))
+
+class BoardFeatures:
+    __slots__ = ("rows", "num_rows", "num_cols", "full", "tops", "heights",
+                 "aggregate_height", "complete_lines", "holes", "bumpiness")
+
+    def __init__(self, rows, num_cols):
+        self.rows = rows
+        self.num_rows = len(rows)
+        self.num_cols = num_cols
+        self.full = (1 << num_cols) - 1
+
+        tops = [self.num_rows] * num_cols
+        complete_lines = 0
+        holes = 0
+        cover = 0
+        for i, row in enumerate(rows):
+            if row == self.full:
+                complete_lines += 1
+            holes += popcount(cover & ~row)
+            new = row & ~cover
+            if new:
+                for col in range(num_cols):
+                    if (new >> col) & 1:
+                        tops[col] = i
+                cover |= row
+
+        self.tops = tops
+        self.heights = [self.num_rows - top for top in tops]
+        self.aggregate_height = sum(self.heights)
+        self.complete_lines = complete_lines
+        self.holes = holes
+        self.bumpiness = sum(abs(self.heights[i] - self.heights[i + 1]) for i in range(num_cols - 1))
+
+    @staticmethod
+    def from_board(board):
+        num_cols = board.width if isinstance(board, BitBoard) else len(board[0])
+        return BoardFeatures(row_masks(board), num_cols)
+
+    def vector(self):
+        return (self.aggregate_height, self.complete_lines, self.holes, self.bumpiness)
+
+#------------------------------------------------------------------------
+# Features of this board with a stone (placements.Rotation) placed at
+# (x, landing), without building the new board.
+# A stone resting on cells in the hidden spawn rows can sit above an
+# overhang, there the touched rows are rescanned instead.
+#------------------------------------------------------------------------
+    def child(self, rotation, x, landing):
+        tops = self.tops
+        heights = self.heights
+        new_heights = list()
+        holes = self.holes
+        for cx in range(rotation.width):
+            gap = tops[x + cx] - (landing + rotation.bottoms[cx]) - 1
+            if gap < 0:
+                return self.rescan(rotation, x, landing)
+            holes += gap
+            new_heights.append(self.num_rows - landing - rotation.tops[cx])
+
+        aggregate_height = self.aggregate_height + sum(new_heights) - sum(heights[x:x + rotation.width])
+
+        complete_lines = self.complete_lines
+        for i, mask in enumerate(rotation.masks):
+            if self.rows[landing + i] | (mask << x) == self.full:
+                complete_lines += 1
+
+        lo = max(x - 1, 0)
+        hi = min(x + rotation.width, self.num_cols - 1)
+        window = heights[lo:x] + new_heights + heights[x + rotation.width:hi + 1]
+        bumpiness = self.bumpiness
+        for i in range(lo, hi):
+            bumpiness -= abs(heights[i] - heights[i + 1])
+            bumpiness += abs(window[i - lo] - window[i - lo + 1])
+
+        return (aggregate_height, complete_lines, holes, bumpiness)
+
+    def rescan(self, rotation, x, landing):
+        rows = self.rows[:]
+        for i, mask in enumerate(rotation.masks):
+            rows[landing + i] |= mask << x
+        return BoardFeatures(rows, self.num_cols).vector()
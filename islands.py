@@ -0,0 +1,164 @@
+#------------------------------------------------------------------------
+# Island-model Genetic Algorithm (same operators as train.py, make_toolbox)
+# 1. n_islands independent DEAP populations, one process each
+#	- Every island is seeded with seed + its index and evaluates its own
+#	  individuals serially (the islands are what uses the cores)
+#	- Only individuals without a valid fitness are evaluated
+# 2. Migration on a ring, every migration_interval generations
+#	- Island i sends copies of its top-k (weights + fitness) to island i + 1
+#	  through a multiprocessing Queue, then waits for the top-k of island i - 1
+#	- Immigrants replace the k worst individuals, before selection
+#	- Islands only block on their inbound queue, so a run is reproducible
+# 3. Each island keeps a HallOfFame and writes metrics50_island<i>.jsonl
+#	- The parent merges the halls of fame into one, writes it to
+#	  hall_of_fame.json and the best individual to best_weights_islands.txt
+# 4. --replay-dir DIR: when an island evaluates a new island best, its games
+#    are played again and kept as DIR/island<i>_gen_<g>_<game>.ttr
+#    (immigrants were scored on another island's pieces and are skipped)
+#
+# Run: python islands.py [--islands 4] [--population 25] [--generations 50]
+#                        [--migration-interval 5] [--migrants 2] [--replay-dir DIR]
+#------------------------------------------------------------------------
+import argparse
+import json
+import multiprocessing
+import os
+import random
+
+import numpy as np
+from deap import algorithms, creator, tools
+
+from evaluation import EvalPolicy, evaluate, record_games
+from train import make_toolbox
+import metrics
+
+def individual(weights, fitness):
+    ind = creator.Individual(weights)
+    ind.fitness.values = tuple(fitness)
+    return ind
+
+#------------------------------------------------------------------------
+# One island: runs in its own process, sends its hall of fame to results
+#------------------------------------------------------------------------
+def run_island(index, config, inbox, outbox, results):
+    toolbox = make_toolbox()
+    seed = config["seed"] + index
+    random.seed(seed)
+    np.random.seed(seed)
+    seed_rng = random.Random(seed)
+    policy = EvalPolicy(max_pieces=config["max_pieces"], n_games=config["n_games"], aggregate="median")
+    hall_of_fame = tools.HallOfFame(config["hof_size"])
+    pop = toolbox.population(n=config["population"])
+    best_score = None
+
+    with metrics.MetricsWriter("metrics50_island%d.jsonl" % index, "w") as metrics_out:
+        for g in range(1, config["generations"] + 1):
+            game_seed = seed_rng.randrange(2**32)
+            placements = 0
+            evaluated = list()
+            for ind in pop:
+                if not ind.fitness.valid:
+                    score, n_placements = evaluate(list(ind), game_seed, policy=policy)
+                    ind.fitness.values = (score,)
+                    placements += n_placements
+                    evaluated.append(ind)
+            if evaluated:
+                best = max(evaluated, key=lambda ind: ind.fitness.values[0])
+                if best_score is None or best.fitness.values[0] > best_score:
+                    best_score = best.fitness.values[0]
+                    if config["replay_dir"] is not None:
+                        record_games(best, game_seed, os.path.join(config["replay_dir"],
+                                                                   "island%d_gen_%d" % (index, g)), policy)
+
+            migrants = 0
+            if config["n_islands"] > 1 and g % config["migration_interval"] == 0:
+                best = tools.selBest(pop, config["migrants"])
+                outbox.put([(list(ind), ind.fitness.values) for ind in best])
+                arrivals = inbox.get()
+                pop.sort(key=lambda ind: ind.fitness.values[0])
+                for i, (weights, fitness) in enumerate(arrivals):
+                    pop[i] = individual(weights, fitness)
+                migrants = len(arrivals)
+
+            hall_of_fame.update(pop)
+            scores = [ind.fitness.values[0] for ind in pop]
+            metrics_out.write({
+                "generation": g,
+                "max": max(scores),
+                "mean": float(np.mean(scores)),
+                "min": min(scores),
+                "std": float(np.std(scores)),
+                "placements": placements,
+                "migrants": migrants,
+                "best_score": hall_of_fame[0].fitness.values[0],
+                "best_genome": list(hall_of_fame[0]),
+            })
+
+            offspring = map(toolbox.clone, toolbox.select(pop, len(pop)))
+            pop[:] = algorithms.varAnd(offspring, toolbox, config["prob_xover"], config["prob_mut"])
+
+    results.put((index, [(list(ind), ind.fitness.values) for ind in hall_of_fame]))
+
+#------------------------------------------------------------------------
+# Starts the islands on a ring of queues and merges their halls of fame
+#------------------------------------------------------------------------
+def run_islands(config):
+    n_islands = config["n_islands"]
+    queues = [multiprocessing.Queue() for i in range(n_islands)]
+    results = multiprocessing.Queue()
+    processes = list()
+    for i in range(n_islands):
+        process = multiprocessing.Process(target=run_island,
+                                          args=(i, config, queues[i], queues[(i + 1) % n_islands], results))
+        process.start()
+        processes.append(process)
+
+    make_toolbox()
+    hall_of_fame = tools.HallOfFame(config["hof_size"])
+    for i in range(n_islands):
+        index, entries = results.get()
+        hall_of_fame.update([individual(weights, fitness) for weights, fitness in entries])
+    for process in processes:
+        process.join()
+    return hall_of_fame
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Train Tetris AI weights with an island-model Genetic Algorithm")
+    parser.add_argument("--islands", type=int, default=os.cpu_count(), help="number of island processes")
+    parser.add_argument("--population", type=int, default=25, help="individuals per island")
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--migration-interval", type=int, default=5, help="generations between migrations")
+    parser.add_argument("--migrants", type=int, default=2, help="top-k individuals sent per migration")
+    parser.add_argument("--max-pieces", type=int, default=10000)
+    parser.add_argument("--games", type=int, default=3, help="games per individual")
+    parser.add_argument("--hof-size", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--replay-dir", default=None, help="keep replays of every new island best's games here")
+    args = parser.parse_args(argv)
+
+    config = {
+        "n_islands": args.islands,
+        "population": args.population,
+        "generations": args.generations,
+        "migration_interval": args.migration_interval,
+        "migrants": args.migrants,
+        "max_pieces": args.max_pieces,
+        "n_games": args.games,
+        "hof_size": args.hof_size,
+        "seed": args.seed,
+        "replay_dir": args.replay_dir,
+        "prob_xover": 0.3,
+        "prob_mut": 0.05,
+    }
+    hall_of_fame = run_islands(config)
+
+    print("Top Score:" + str(hall_of_fame[0].fitness.values[0]))
+    with open("hall_of_fame.json", "w") as file:
+        json.dump([{"weights": list(ind), "fitness": ind.fitness.values[0]} for ind in hall_of_fame], file, indent=2)
+        file.write("\n")
+    file = open("best_weights_islands.txt", "w")
+    file.write(str(list(hall_of_fame[0])))
+    file.close()
+
+if __name__ == "__main__":
+    main()
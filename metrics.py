@@ -0,0 +1,37 @@
+#------------------------------------------------------------------------
+# Per-run metrics stream for the Genetic Algorithm (train.py)
+# 1. One JSON object per line per generation, appended to a single file
+#	- The file is line buffered, every record is on disk as soon as it
+#	  is written, so a run can be followed with tail -f
+# 2. load returns the records as a list of dicts, columns as a dict of
+#    NumPy arrays; pandas.read_json(path, lines=True) also reads the file
+#------------------------------------------------------------------------
+import json
+
+import numpy as np
+
+class MetricsWriter:
+    def __init__(self, path, mode = "a"):
+        self.path = path
+        self.file = open(path, mode, buffering=1)
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def load(path):
+    with open(path, "r") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+def columns(path):
+    records = load(path)
+    keys = records[0].keys() if records else []
+    return {key: np.array([record.get(key) for record in records]) for key in keys}
@@ -0,0 +1,51 @@
+#------------------------------------------------------------------------
+# Vectorized (NumPy) batch scoring of candidate placements
+# 1. Every candidate board is stacked into one (N, 22, 10) uint8 array
+# 2. Heights, holes, bumpiness and complete lines are computed for all
+#    candidates at once with NumPy reductions
+# 3. The best candidate is the argmax of features @ weights
+#	- argmax returns the first maximum, like scores.index(max(scores))
+#------------------------------------------------------------------------
+import numpy as np
+
+from bitboard import BitBoard
+
+def board_cells(board):
+    if isinstance(board, BitBoard):
+        rows = np.array(board.rows[:-1], dtype=np.uint16)
+        return ((rows[:, None] >> np.arange(board.width)) & 1).astype(np.uint8)
+    return (np.array(board[:-1]) != 0).astype(np.uint8)
+
+#------------------------------------------------------------------------
+# candidates: list of (placements.Rotation, x, landing)
+#------------------------------------------------------------------------
+def candidate_cells(board, candidates):
+    parent = board_cells(board)
+    cells = np.repeat(parent[None], len(candidates), axis=0)
+    ks, ys, xs = list(), list(), list()
+    for k, (rotation, x, landing) in enumerate(candidates):
+        for cy, row in enumerate(rotation.shape):
+            for cx, cell in enumerate(row):
+                if cell:
+                    ks.append(k)
+                    ys.append(landing + cy)
+                    xs.append(x + cx)
+    cells[ks, ys, xs] = 1
+    return cells
+
+#------------------------------------------------------------------------
+# Columns: aggregate height, complete lines, holes, bumpiness
+#------------------------------------------------------------------------
+def batch_features(cells):
+    num_rows = cells.shape[1]
+    filled = cells != 0
+    heights = np.where(filled.any(axis=1), num_rows - filled.argmax(axis=1), 0)
+    complete_lines = filled.all(axis=2).sum(axis=1)
+    cover = np.logical_or.accumulate(filled, axis=1)
+    holes = (cover & ~filled).sum(axis=(1, 2))
+    bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+    return np.stack((heights.sum(axis=1), complete_lines, holes, bumpiness), axis=1)
+
+def best_index(features, weights):
+    scores = features @ np.asarray(weights[:features.shape[1]], dtype=np.float64)
+    return int(np.argmax(scores))
@@ -0,0 +1,54 @@
+#------------------------------------------------------------------------
+# Seeded piece generator
+# 1. Modes
+#	- "bag": the "7 system", every run of 7 pieces is a shuffled bag
+#	  holding each tetromino exactly once
+#	- "uniform": every piece is drawn independently
+# 2. Pieces are indices into tetris_shapes, pre-generated into a compact
+#    array('B') and extended on demand from the same seeded RNG
+# 3. copy() shares the sequence but starts again from the first piece,
+#    so several games (or individuals) can play the same pieces
+#------------------------------------------------------------------------
+import random
+from array import array
+
+num_pieces = 7
+modes = ("bag", "uniform")
+
+class PieceSource:
+    __slots__ = ("seed", "mode", "rng", "sequence", "pos")
+
+    def __init__(self, seed = None, mode = "bag", length = 0):
+        if mode not in modes:
+            raise ValueError("unknown piece mode: %r" % (mode,))
+        self.seed = seed
+        self.mode = mode
+        self.rng = random.Random(seed)
+        self.sequence = array('B')
+        self.pos = 0
+        self.generate(length)
+
+    def generate(self, length):
+        while len(self.sequence) < length:
+            if self.mode == "bag":
+                bag = list(range(num_pieces))
+                self.rng.shuffle(bag)
+                self.sequence.extend(bag)
+            else:
+                self.sequence.append(self.rng.randrange(num_pieces))
+
+    def next_piece(self):
+        if self.pos >= len(self.sequence):
+            self.generate(self.pos + 1)
+        piece = self.sequence[self.pos]
+        self.pos += 1
+        return piece
+
+    def copy(self):
+        source = PieceSource.__new__(PieceSource)
+        source.seed = self.seed
+        source.mode = self.mode
+        source.rng = self.rng
+        source.sequence = self.sequence
+        source.pos = 0
+        return source
@@ -0,0 +1,134 @@
+#------------------------------------------------------------------------
+# Placement table
+# 1. Per stone: its distinct rotations (O, I, S and Z repeat themselves),
+#    each with its width and per-column bottom (and top) offsets
+# 2. Per board: the top filled row of every column
+# 3. The landing row of a (rotation, x) is then computed in O(width):
+#	- landing = min over the stone columns c of (top[x + c] - bottom[c]) - 1
+#	- landing < 0 means the stone already collides at the spawn row
+# 4. Placements are yielded in the same order as the old step-by-step
+#    enumeration: rotation 0..3, then spawn x, left moves, right moves
+#------------------------------------------------------------------------
+from engine import Moves, check_collision, rotate_clockwise
+from bitboard import BitBoard, shape_masks
+
+_rotation_cache = {}
+_path_cache = {}
+
+class Rotation:
+    __slots__ = ("num_rot", "shape", "masks", "width", "bottoms", "tops", "unique")
+
+    def __init__(self, num_rot, shape, unique):
+        self.num_rot = num_rot
+        self.shape = shape
+        self.masks = shape_masks(shape)
+        self.width = len(shape[0])
+        self.bottoms = [max(cy for cy, row in enumerate(shape) if row[cx])
+                        for cx in range(self.width)]
+        self.tops = [min(cy for cy, row in enumerate(shape) if row[cx])
+                     for cx in range(self.width)]
+        self.unique = unique
+
+def rotations(stone):
+    key = tuple(map(tuple, stone))
+    table = _rotation_cache.get(key)
+    if table is None:
+        table = list()
+        seen = set()
+        shape = stone
+        for num_rot in range(4):
+            shape_key = tuple(map(tuple, shape))
+            table.append(Rotation(num_rot, shape, shape_key not in seen))
+            seen.add(shape_key)
+            shape = rotate_clockwise(shape)
+        _rotation_cache[key] = table
+    return table
+
+def column_tops(board):
+    if isinstance(board, BitBoard):
+        num_rows = len(board.rows) - 1
+        return [num_rows - height for height in board.heights()]
+    num_rows = len(board) - 1
+    tops = list()
+    for col in range(len(board[0])):
+        top = num_rows
+        for row in range(num_rows):
+            if board[row][col]:
+                top = row
+                break
+        tops.append(top)
+    return tops
+
+def landing_row(tops, rotation, x):
+    return min(tops[x + cx] - bottom for cx, bottom in enumerate(rotation.bottoms)) - 1
+
+def collides_at_spawn(board, rotation, x):
+    if isinstance(board, BitBoard):
+        return board.collides(rotation.masks, x, 0)
+    return check_collision(board, rotation.shape, (x, 0))
+
+def drop_row(board, rotation, x):
+    if isinstance(board, BitBoard):
+        return board.drop_row(rotation.masks, x, 0)
+    y = 0
+    while not check_collision(board, rotation.shape, (x, y + 1)):
+        y += 1
+    return y
+
+#------------------------------------------------------------------------
+# Yields (moves, rotation, x, landing) for every reachable placement
+#	- moves are shared, precomputed tuples (see move_path)
+#	- tops can be passed in when the caller already has them
+#	- A rotation is tried at the spawn x and stops the chain if it collides
+#	- Left/right moves stop at the wall or at the first collision
+#	- Landing rows come from the column tops; a stone hanging over cells
+#	  in the hidden spawn rows falls back to a step-by-step drop
+#------------------------------------------------------------------------
+def move_path(num_rot, direction, num_moves):
+    key = (num_rot, direction, num_moves)
+    path = _path_cache.get(key)
+    if path is None:
+        path = (Moves.ROT,) * num_rot + (direction,) * num_moves + (Moves.DROP,)
+        _path_cache[key] = path
+    return path
+
+def placements(board, stone, num_cols, tops = None):
+    if tops is None:
+        tops = column_tops(board)
+    spawn_x = int(num_cols / 2 - len(stone[0])/2)
+
+    def landing_at(rotation, x):
+        if x < 0 or x + rotation.width > num_cols:
+            return None
+        landing = landing_row(tops, rotation, x)
+        if landing < 0:
+            if collides_at_spawn(board, rotation, x):
+                return None
+            landing = drop_row(board, rotation, x)
+        return landing
+
+    for rotation in rotations(stone):
+        landing = landing_at(rotation, spawn_x)
+        if landing is None:
+            break
+        if not rotation.unique:
+            continue
+        yield (move_path(rotation.num_rot, Moves.DROP, 0), rotation, spawn_x, landing)
+
+        for direction, delta_x in ((Moves.LEFT, -1), (Moves.RIGHT, 1)):
+            num_moves = 0
+            x = spawn_x + delta_x
+            landing = landing_at(rotation, x)
+            while landing is not None:
+                num_moves += 1
+                yield (move_path(rotation.num_rot, direction, num_moves), rotation, x, landing)
+                x += delta_x
+                landing = landing_at(rotation, x)
+
+#------------------------------------------------------------------------
+# True when the stone already collides at its spawn: the game is over and
+# placements() yields nothing
+#------------------------------------------------------------------------
+def spawn_blocked(board, stone, num_cols):
+    spawn_x = int(num_cols / 2 - len(stone[0])/2)
+    return collides_at_spawn(board, rotations(stone)[0], spawn_x)
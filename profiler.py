@@ -0,0 +1,51 @@
+#------------------------------------------------------------------------
+# Opt-in per-phase profiling
+# 1. A PhaseProfiler keeps cumulative seconds + call counts per phase:
+#	- enumerate: placement generation (moves + landing rows, placements.py)
+#	- drop: the hard drop of the chosen move (lock + line clears)
+#	- features: candidate features (features.py / npfeatures.py, cache lookups)
+#	- scoring: weighted sums + picking the best candidate (the lookahead
+#	  search counts here, minus its own enumerate / features time)
+#	- engine_step: set_board + the rotate / left / right moves
+#	- render: drawing + display update (tetris.py watch mode)
+# 2. Hooks check `profiler is not None` once per call, so leaving it off
+#    costs nothing; turned on it adds two perf_counter calls per phase
+# 3. report() / export() give seconds, calls and us per call per phase;
+#    merge() adds up profilers, e.g. one per game
+#------------------------------------------------------------------------
+import time
+
+phases = ("enumerate", "drop", "features", "scoring", "engine_step", "render")
+clock = time.perf_counter
+
+class PhaseProfiler:
+    __slots__ = ("seconds", "calls")
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(phases, 0.0)
+        self.calls = dict.fromkeys(phases, 0)
+
+    def add(self, phase, seconds, calls = 1):
+        self.seconds[phase] += seconds
+        self.calls[phase] += calls
+
+    def merge(self, other):
+        for phase in phases:
+            self.add(phase, other.seconds[phase], other.calls[phase])
+
+    def reset(self):
+        for phase in phases:
+            self.seconds[phase] = 0.0
+            self.calls[phase] = 0
+
+    def report(self):
+        return {phase: {"seconds": self.seconds[phase],
+                        "calls": self.calls[phase],
+                        "us_per_call": self.seconds[phase] / self.calls[phase] * 1e6 if self.calls[phase] else 0.0}
+                for phase in phases}
+
+    def export(self, path):
+        import json
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+            file.write("\n")
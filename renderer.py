@@ -0,0 +1,123 @@
+#------------------------------------------------------------------------
+# Dirty-region renderer for TetrisApp (pygame)
+# 1. Pre-rendered once: one tile per color, the checkerboard well
+# 2. Every frame the well (board + falling stone) and the next stone are
+#    composed into color indices and compared with what is on screen:
+#	- only cells that changed are blitted
+#	- pygame.display.update gets the list of their rects
+# 3. Text (score, level, ...) is rendered again only when it changes
+# 4. Messages (paused, game over) cover the whole screen; the next frame
+#    redraws everything (invalidate)
+#------------------------------------------------------------------------
+import pygame
+
+class Renderer:
+    def __init__(self, screen, font, colors, cell_size, cols, rows, grid):
+        self.screen = screen
+        self.font = font
+        self.cell_size = cell_size
+        self.cols = cols
+        self.rows = rows
+        self.grid = [cell for row in grid for cell in row]
+        self.tiles = list()
+        for color in colors:
+            tile = pygame.Surface((cell_size, cell_size))
+            tile.fill(color)
+            self.tiles.append(tile)
+        self.well = pygame.Surface((cell_size * cols, cell_size * rows))
+        for i, cell in enumerate(self.grid):
+            self.well.blit(self.tiles[cell], ((i % cols) * cell_size, (i // cols) * cell_size))
+        self.preview_x = cols + 1
+        self.preview_y = 2
+        self.invalidate()
+
+    def invalidate(self):
+        self.shown = None
+        self.shown_next = None
+        self.texts = dict()
+        self.shown_message = None
+
+#------------------------------------------------------------------------
+# Full-screen message, drawn only when it differs from the one shown
+#------------------------------------------------------------------------
+    def message(self, msg):
+        if msg == self.shown_message:
+            return
+        self.invalidate()
+        self.shown_message = msg
+        width, height = self.screen.get_size()
+        self.screen.fill((0, 0, 0))
+        for i, line in enumerate(msg.splitlines()):
+            image = self.font.render(line, False, (255, 255, 255), (0, 0, 0))
+            image_w, image_h = image.get_size()
+            self.screen.blit(image, (width // 2 - image_w // 2, height // 2 - image_h // 2 + i * 22))
+        pygame.display.update()
+
+#------------------------------------------------------------------------
+# One frame of the game: texts = [(msg, topleft)]
+#------------------------------------------------------------------------
+    def draw(self, board, stone, stone_pos, next_stone, texts):
+        dirty = list()
+        full = self.shown is None
+        if full:
+            width, height = self.screen.get_size()
+            rlim = self.cell_size * self.cols
+            self.screen.fill((0, 0, 0))
+            self.screen.blit(self.well, (0, 0))
+            pygame.draw.line(self.screen, (255, 255, 255), (rlim + 1, 0), (rlim + 1, height - 1))
+            self.shown = self.grid[:]
+            self.shown_next = [0] * 8
+
+        cols = self.cols
+        cells = self.grid[:]
+        for y, row in enumerate(board[:self.rows]):
+            base = y * cols
+            for x, val in enumerate(row):
+                if val:
+                    cells[base + x] = val
+        stone_x, stone_y = stone_pos
+        for y, row in enumerate(stone):
+            for x, val in enumerate(row):
+                if val and 0 <= stone_y + y < self.rows:
+                    cells[(stone_y + y) * cols + stone_x + x] = val
+        self.blit_changed(cells, self.shown, cols, 0, 0, dirty)
+
+        preview = [0] * 8
+        for y, row in enumerate(next_stone):
+            for x, val in enumerate(row):
+                preview[y * 4 + x] = val
+        self.blit_changed(preview, self.shown_next, 4, self.preview_x, self.preview_y, dirty)
+
+        for msg, topleft in texts:
+            self.text(msg, topleft, dirty)
+
+        if full:
+            pygame.display.update()
+        elif dirty:
+            pygame.display.update(dirty)
+
+    def blit_changed(self, cells, shown, width, off_x, off_y, dirty):
+        size = self.cell_size
+        tiles = self.tiles
+        for i, val in enumerate(cells):
+            if val != shown[i]:
+                shown[i] = val
+                rect = pygame.Rect((off_x + i % width) * size, (off_y + i // width) * size, size, size)
+                self.screen.blit(tiles[val], rect)
+                dirty.append(rect)
+
+    def text(self, msg, topleft, dirty):
+        old = self.texts.get(topleft)
+        if old is not None and old[0] == msg:
+            return
+        x, y = topleft
+        images = [self.font.render(line, False, (255, 255, 255), (0, 0, 0)) for line in msg.splitlines()]
+        rect = pygame.Rect(x, y, max([image.get_width() for image in images] + [0]), 14 * len(images))
+        if old is not None:
+            self.screen.fill((0, 0, 0), old[1])
+            dirty.append(old[1])
+        for image in images:
+            self.screen.blit(image, (x, y))
+            y += 14
+        dirty.append(rect)
+        self.texts[topleft] = (msg, rect)
@@ -0,0 +1,134 @@
+#------------------------------------------------------------------------
+# Compact binary game replays
+# 1. File: a 16 byte header, then 1 byte per placement, append only
+#	- header: b"TTRP", version, piece mode (0 bag, 1 uniform), 2 unused
+#	  bytes, the 64-bit piece seed (little endian)
+#	- placement: rotation << 4 | x (rotation 0..3 from the spawn shape,
+#	  x the column the stone was dropped in)
+#	- The piece sequence is not stored, it is regenerated from the seed
+#	- Missing directories of the replay path are created
+# 2. Snapshots: every snapshot_every placements the writer appends the
+#    GameEngine state (GameEngine.snapshot) to <replay>.snap (pickles)
+# 3. Replay memory-maps a replay and re-simulates it on a headless
+#    GameEngine: rotate at the spawn, move to x, hard drop
+#	- seek(n) starts from the last snapshot at or before placement n;
+#	  without a .snap file, snapshots are taken while simulating
+#	- Stones that were soft dropped and slid under an overhang by hand
+#	  cannot be expressed as (rotation, x); AI games always can
+#------------------------------------------------------------------------
+import mmap
+import os
+import pickle
+import random
+import struct
+
+from engine import GameEngine
+from pieces import PieceSource, modes
+
+magic = b"TTRP"
+version = 1
+header = struct.Struct("<4sBBxxQ")
+
+class ReplayWriter:
+    def __init__(self, path, seed, mode = "bag", snapshot_every = 1000):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "wb")
+        self.file.write(header.pack(magic, version, modes.index(mode), seed))
+        self.snapshots = open(path + ".snap", "wb") if snapshot_every else None
+
+    def placement(self, engine, rotation, x):
+        self.file.write(bytes(((rotation << 4) | x,)))
+        if self.snapshots is not None and engine.placements % self.snapshot_every == 0:
+            pickle.dump(engine.snapshot(), self.snapshots, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def close(self):
+        self.file.close()
+        if self.snapshots is not None:
+            self.snapshots.close()
+
+#------------------------------------------------------------------------
+# Records the next game of engine to path, call before the game starts
+#	- An unseeded game gets a random seed, so its pieces can be replayed
+#------------------------------------------------------------------------
+def record(engine, path, seed = None, snapshot_every = 1000):
+    if seed is None:
+        seed = random.SystemRandom().randrange(2**63)
+    engine.set_pieces(PieceSource(seed, engine.mode))
+    engine.recorder = ReplayWriter(path, seed, engine.mode, snapshot_every)
+    return engine.recorder
+
+class Replay:
+    def __init__(self, path, snapshot_every = 1000):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        tag, file_version, mode, self.seed = header.unpack_from(self.data)
+        if tag != magic or file_version != version:
+            raise ValueError("not a replay file: %r" % (path,))
+        self.mode = modes[mode]
+        self.snapshots = dict()
+        if os.path.exists(path + ".snap"):
+            with open(path + ".snap", "rb") as file:
+                while True:
+                    try:
+                        state = pickle.load(file)
+                    except EOFError:
+                        break
+                    self.snapshots[state["placements"]] = state
+
+    def __len__(self):
+        return len(self.data) - header.size
+
+    def move(self, i):
+        value = self.data[header.size + i]
+        return (value >> 4, value & 15)
+
+    def close(self):
+        self.data.close()
+
+    def new_engine(self):
+        return GameEngine(bitboard=True, seed=self.seed, mode=self.mode)
+
+#------------------------------------------------------------------------
+# Re-simulation: returns a GameEngine after placement n (default: all)
+#------------------------------------------------------------------------
+    def seek(self, n = None, engine = None):
+        n = len(self) if n is None else min(n, len(self))
+        if engine is None:
+            engine = self.new_engine()
+        start = max([i for i in self.snapshots if i <= n], default=0)
+        engine.set_pieces(PieceSource(self.seed, self.mode))
+        if start > 0:
+            engine.restore(self.snapshots[start])
+        else:
+            engine.init_game()
+            engine.gameover = False
+        data = self.data
+        for i in range(start, n):
+            value = data[header.size + i]
+            apply(engine, value >> 4, value & 15)
+            if self.snapshot_every and engine.placements % self.snapshot_every == 0:
+                self.snapshots.setdefault(engine.placements, engine.snapshot())
+        return engine
+
+    def final_score(self):
+        return self.seek().score
+
+def apply(engine, rotation, x):
+    if engine.gameover:
+        raise ValueError("placement after game over at %d" % engine.placements)
+    for r in range(rotation):
+        engine.rotate_stone()
+    if engine.stone_rotation != rotation:
+        raise ValueError("placement %d cannot rotate %d times" % (engine.placements, rotation))
+    while engine.stone_x != x:
+        stone_x = engine.stone_x
+        engine.move(1 if x > stone_x else -1)
+        if engine.stone_x == stone_x:
+            raise ValueError("placement %d cannot reach x=%d" % (engine.placements, x))
+    engine.insta_drop()
@@ -0,0 +1,34 @@
+import random
+
+from ai import Train
+from batchengine import BatchEngine
+from engine import GameEngine
+from evaluation import EvalPolicy, evaluate, evaluate_batch
+from pieces import PieceSource
+
+#------------------------------------------------------------------------
+# The lockstep NumPy engine against GameEngine + greedy Train, game by
+# game, on seeded random genomes (some play until game over)
+#------------------------------------------------------------------------
+def random_genomes(rng, n):
+    return [[rng.uniform(-1, 1) for i in range(4)] for j in range(n)]
+
+def test_batch_games_match_serial_games():
+    rng = random.Random(21)
+    genomes = random_genomes(rng, 12)
+    seeds = [rng.randrange(2**32) for genome in genomes]
+    batch = BatchEngine(len(genomes))
+    batch.play(genomes, [PieceSource(seed) for seed in seeds], max_pieces=300)
+    for i, (genome, seed) in enumerate(zip(genomes, seeds)):
+        engine = GameEngine(bitboard=True)
+        score = engine.play(Train(genome), pieces=PieceSource(seed), max_pieces=300)
+        assert (score, engine.placements, engine.lines) == \
+            (batch.score[i], batch.placements[i], batch.lines[i])
+
+def test_evaluate_batch_matches_evaluate():
+    rng = random.Random(7)
+    genomes = random_genomes(rng, 6)
+    seeds = [rng.randrange(2**32) for genome in genomes]
+    policy = EvalPolicy(max_pieces=200, n_games=3, aggregate="median")
+    expected = [evaluate(genome, seed, policy=policy) for genome, seed in zip(genomes, seeds)]
+    assert evaluate_batch(genomes, seeds, policy) == expected
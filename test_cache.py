@@ -0,0 +1,20 @@
+from ai import Train
+from cache import TranspositionCache, entry_bytes
+from engine import GameEngine
+from pieces import PieceSource
+
+def test_lru_evicts_least_recently_used():
+    cache = TranspositionCache(max_entries=2)
+    cache.put((1, ()), [])
+    cache.put((2, ()), [])
+    cache.get((1, ()))
+    cache.put((3, ()), [])
+    assert list(cache.entries) == [(1, ()), (3, ())]
+
+def test_lookahead_cache_stays_within_its_byte_bound(weights):
+    max_bytes = 1 << 20
+    train = Train(weights, lookahead=True, cache_bytes=max_bytes)
+    GameEngine(bitboard=True).play(train, pieces=PieceSource(3), max_pieces=300)
+    cache = train.cache
+    assert 0 < cache.bytes <= max_bytes
+    assert cache.bytes == sum(entry_bytes(key, value) for key, value in cache.entries.items())
@@ -0,0 +1,35 @@
+from evaluation import EvalPolicy, FitnessCache
+
+def test_fitness_cache_drops_a_truncated_last_record(tmp_path):
+    path = str(tmp_path / "fitness.jsonl")
+    policy = EvalPolicy(max_pieces=10)
+    keys = [FitnessCache.key([float(i)] * 4, 1, None, policy) for i in range(3)]
+    cache = FitnessCache(path)
+    cache.put(keys[0], (1.0, 10))
+    cache.put(keys[1], (2.0, 10))
+    cache.close()
+    with open(path, "rb+") as file:
+        data = file.read()
+        file.seek(0)
+        file.truncate()
+        file.write(data[:-7])
+
+    cache = FitnessCache(path)
+    assert cache.get(keys[0]) == (1.0, 10)
+    assert cache.get(keys[1]) is None
+    cache.put(keys[2], (3.0, 10))
+    cache.close()
+
+    cache = FitnessCache(path)
+    assert cache.get(keys[0]) == (1.0, 10)
+    assert cache.get(keys[2]) == (3.0, 10)
+    cache.close()
+
+def test_recorded_games_replay_the_evaluated_games(weights, tmp_path):
+    from evaluation import evaluate, record_games
+    from replay import Replay
+    policy = EvalPolicy(max_pieces=150, n_games=3, aggregate="median")
+    prefix = str(tmp_path / "replays" / "gen_1")
+    scores = record_games(weights, 9, prefix, policy)
+    assert policy.fitness(scores) == evaluate(weights, 9, policy=policy)[0]
+    assert [Replay("%s_%d.ttr" % (prefix, i)).final_score() for i in range(3)] == scores
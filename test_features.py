@@ -0,0 +1,33 @@
+import random
+
+from ai import Train
+from bitboard import BitBoard
+from engine import rows, tetris_shapes
+from features import BoardFeatures, row_masks
+from placements import placements, spawn_blocked
+
+#------------------------------------------------------------------------
+# BoardFeatures.child (incremental) against a full scan of the board the
+# placement leaves, on list boards and bitboards
+#------------------------------------------------------------------------
+def test_child_matches_full_rescan(weights, random_board):
+    rng = random.Random(5)
+    train = Train(weights)
+    checked = 0
+    for i in range(400):
+        board = random_board(rng, rows)
+        if rng.random() < 0.5:
+            board = BitBoard.from_matrix(board)
+        stone = rng.choice(tetris_shapes)
+        num_cols = board.width if isinstance(board, BitBoard) else len(board[0])
+        if spawn_blocked(board, stone, num_cols):
+            continue
+        train.set_board(board, stone)
+        parent = BoardFeatures(row_masks(board), num_cols)
+        moves, states = train.enumerate(train.begin_state)
+        found = list(placements(board, stone, num_cols))
+        assert len(found) == len(states)
+        for (path, rotation, x, landing), state in zip(found, states):
+            assert parent.child(rotation, x, landing) == BoardFeatures.from_board(state.board).vector()
+            checked += 1
+    assert checked > 5000
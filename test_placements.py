@@ -0,0 +1,101 @@
+import random
+
+from ai import Memory, Train, game_over_move
+from bitboard import BitBoard
+from engine import GameEngine, Moves, new_board, rows, tetris_shapes
+from pieces import PieceSource
+from placements import placements, spawn_blocked
+
+def board_key(board):
+    return tuple(map(tuple, board))
+
+#------------------------------------------------------------------------
+# The step-by-step enumeration placements() replaced: every rotation
+# (repeats included), left and right moves until blocked, then a drop
+#------------------------------------------------------------------------
+def step_by_step(train, begin_state):
+    found = dict()
+
+    def drop(moves, state):
+        state = Memory.clone(state)
+        train.insta_drop(state)
+        found[tuple(moves + [Moves.DROP])] = state.board
+
+    temp = Memory.clone(begin_state)
+    for num_rot in range(4):
+        if num_rot and not train.rotate_stone(temp):
+            break
+        drop([Moves.ROT] * num_rot, temp)
+        for direction, delta_x in ((Moves.LEFT, -1), (Moves.RIGHT, 1)):
+            moved = Memory.clone(temp)
+            num_moves = 0
+            while train.move(moved, delta_x):
+                num_moves += 1
+                drop([Moves.ROT] * num_rot + [direction] * num_moves, moved)
+    return found
+
+def test_placements_match_step_by_step(weights, random_board):
+    rng = random.Random(4)
+    train = Train(weights)
+    checked = 0
+    for i in range(400):
+        board = random_board(rng)
+        stone = rng.choice(tetris_shapes)
+        train.set_board(board, stone)
+        if spawn_blocked(board, stone, train.num_cols):
+            continue
+        old = step_by_step(train, train.begin_state)
+        moves, states = train.enumerate(train.begin_state)
+        assert len(set(moves)) == len(moves)
+        for path, state in zip(moves, states):
+            assert old[path] == state.board
+        assert {board_key(board) for board in old.values()} == {board_key(state.board) for state in states}
+        checked += 1
+    assert checked > 300
+
+def test_bitboard_and_list_boards_play_the_same_game(weights):
+    results = list()
+    for bitboard in (False, True):
+        engine = GameEngine(bitboard=bitboard)
+        score = engine.play(Train(weights, bitboard=bitboard), pieces=PieceSource(7), max_pieces=500)
+        results.append((score, engine.placements, engine.lines))
+    assert results[0] == results[1]
+
+#------------------------------------------------------------------------
+# Game over: the stone collides at its spawn, every move path must still
+# return a move instead of failing on an empty candidate list
+#------------------------------------------------------------------------
+def game_over_board():
+    board = new_board()
+    for y in range(rows):
+        board[y] = [1] * (len(board[0]) - 1) + [0]
+    return board
+
+def test_game_over_board_has_no_placements():
+    board = game_over_board()
+    for stone in tetris_shapes:
+        assert spawn_blocked(board, stone, len(board[0]))
+        assert list(placements(board, stone, len(board[0]))) == []
+
+def test_best_move_on_game_over_board(weights):
+    board = game_over_board()
+    options = [dict(), dict(bitboard=True), dict(batch=True), dict(lookahead=True)]
+    for stone in tetris_shapes:
+        for kwargs in options:
+            train = Train(weights, **kwargs)
+            train.set_board(board, stone, tetris_shapes[0])
+            assert train.get_best_move() == game_over_move
+
+def test_game_over_board_as_bitboard(weights):
+    board = BitBoard.from_matrix(game_over_board())
+    train = Train(weights)
+    train.set_board(board, tetris_shapes[6])
+    assert train.get_best_move() == game_over_move
+
+def test_exported_best_move_on_game_over_board(weights, tmp_path):
+    from dataset import DecisionExporter
+    exporter = DecisionExporter(str(tmp_path), chunk_size=16)
+    train = Train(weights, exporter=exporter)
+    train.set_board(game_over_board(), tetris_shapes[0])
+    assert train.get_best_move() == game_over_move
+    exporter.close()
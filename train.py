@@ -1,6 +1,9 @@
-from tetris import TetrisApp
-from deap import base, creator, tools, algorithms
-import numpy as np
+from evaluation import EvalPolicy, FitnessCache, evaluate, evaluate_batch, make_map, record_games
+import checkpoint
+import argparse
+import os
+import random
+import time
 from operator import attrgetter
 
 # from deap import base
@@ -43,9 +46,22 @@ from operator import attrgetter
 #     pop[:] = offspring
 
 
-if __name__ == "__main__":
-    creator.create("FitnessMax", base.Fitness, weights=(1.0,))
-    creator.create("Individual", list, fitness=creator.FitnessMax)
+# DEAP + NumPy are imported by make_toolbox / main only, so processes that
+# import this module (e.g. pool workers) do not pay for them
+
+#------------------------------------------------------------
+# The GA operators, shared with islands.py:
+#   - Individuals: 5 weights drawn uniformly from [-1, 1]
+#   - Blend crossover (alpha 0.4), gaussian mutation (sigma 0.3)
+#   - Tournament selection (size 5)
+#------------------------------------------------------------
+def make_toolbox():
+    from deap import base, creator, tools
+    import numpy as np
+
+    if not hasattr(creator, "FitnessMax"):
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMax)
 
     toolbox = base.Toolbox()
 
@@ -58,12 +74,47 @@ if __name__ == "__main__":
     toolbox.register("mate", tools.cxBlend, alpha=0.4)
     toolbox.register("mutate", tools.mutGaussian, mu=0.0, sigma=0.3, indpb=0.05)
     toolbox.register("select", tools.selTournament, tournsize=5)
+    return toolbox
+
+def main(argv = None):
+    from deap import creator, algorithms
+    import numpy as np
+    import metrics
+
+    parser = argparse.ArgumentParser(description="Train Tetris AI weights with a Genetic Algorithm")
+    parser.add_argument("--resume", action="store_true", help="continue from the last checkpoint")
+    parser.add_argument("--output", default="best_weights50.txt", help="where to write the best weights")
+    parser.add_argument("--fitness-cache", default=None, metavar="PATH",
+                        help="keep fitnesses in this JSON lines file across runs (off by default)")
+    parser.add_argument("--replay-dir", default=None, metavar="DIR",
+                        help="keep replays of every new best individual's games in DIR (off by default)")
+    args = parser.parse_args(argv)
+
+    toolbox = make_toolbox()
 
     #------------------------------------------------------------
     # Define Parameters
-    # Setup to grab statistics
+    # Setup to grab statistics, one JSON line per generation in metrics_path
     #   - Max, mean, min, std, variance
+    #   - Evaluation wall time, placements/sec, fitness cache hit rate
+    #   - Best score + genome so far
+    # Seed the GA + every game, fitness is evaluated in n_workers processes
+    #   - Same seed => same fitnesses, whatever n_workers is
+    #   - common_pieces: every individual of a generation plays the same pieces
+    # batched: play every game of a generation in lockstep on the NumPy
+    #   BatchEngine instead of one game at a time (no cutoff threshold)
+    # Evaluation policy: max pieces per game, games per individual + aggregate
+    #   - cutoff_quantile: skip the remaining games of an individual once it
+    #     cannot beat this quantile of the previous generation's fitnesses
     # Setup containers for highest score and highest scoring individual
+    # Only individuals without a valid fitness are evaluated (varAnd keeps the
+    #   fitness of unmodified clones); --fitness-cache PATH keeps every result
+    #   on disk across runs, keyed on (fitness_version, piece_mode, weights,
+    #   seed, threshold, policy), see evaluation.FitnessCache
+    # --replay-dir DIR: whenever a generation finds a new best individual, its
+    #   games are played again and kept as DIR/gen_<g>_<game>.ttr (replay.py)
+    # Checkpoint every checkpoint_every generations, --resume continues
+    #   bit-for-bit from the last checkpoint
     # Create a Genetic Algorithm loop
     #   - This loop will achieve the following:
     #       a. Select and clone the next generation individuals
@@ -74,45 +125,140 @@ if __name__ == "__main__":
     # n_gen = 100
     prob_xover = 0.3
     prob_mut = 0.05
+    seed = 1
+    n_workers = os.cpu_count()
+    common_pieces = True
+    batched = False
+    policy = EvalPolicy(max_pieces=10000, n_games=3, aggregate="median")
+    cutoff_quantile = 0.5
+    threshold = None
+    random.seed(seed)
+    np.random.seed(seed)
+    seed_rng = random.Random(seed)
+    checkpoint_path = "checkpoint50.pkl"
+    checkpoint_every = 1
+    fitness_cache = FitnessCache(args.fitness_cache)
+    ga_map, executor = make_map(n_workers)
+    toolbox.register("map", ga_map)
+    toolbox.register("evaluate", evaluate, policy=policy)
+
     pop = toolbox.population(n=25)
     # pop = toolbox.population(n=1000)
-    game = TetrisApp(training=True)
     best_ind = []
     best_score = -1
+    first_gen = 1
+    metrics_path = "metrics50.jsonl"
+    metrics_mode = "w"
 
-    max_out  = open("max50.txt", "w")
-    mean_out = open("mean50.txt", "w")
-    min_out  = open("min50.txt", "w")
-    std_out  = open("std50.txt", "w")
-    var_out  = open("var50.txt", "w")
+    if args.resume and os.path.exists(checkpoint_path):
+        state = checkpoint.load(checkpoint_path)
+        pop = []
+        for weights, fitness in zip(state["population"], state["fitnesses"]):
+            ind = creator.Individual(weights)
+            if fitness is not None:
+                ind.fitness.values = fitness
+            pop.append(ind)
+        best_ind = creator.Individual(state["best_ind"])
+        best_score = state["best_score"]
+        threshold = state["threshold"]
+        random.setstate(state["random_state"])
+        np.random.set_state(state["numpy_state"])
+        seed_rng.setstate(state["seed_rng_state"])
+        first_gen = state["generation"] + 1
+        checkpoint.truncate_lines(metrics_path, state["generation"])
+        metrics_mode = "a"
+        print("Resuming from generation " + str(first_gen))
 
-    for g in range(1, n_gen + 1):
+    metrics_out = metrics.MetricsWriter(metrics_path, metrics_mode)
+
+    for g in range(first_gen, n_gen + 1):
         print("Current Generation " + str(g))
         scores = []
-        for ind in pop:
-            score = game.run_train(ind)
-            scores.append(score)
+        placements = 0
+        start = time.perf_counter()
+        if common_pieces:
+            seeds = [seed_rng.randrange(2**32)] * len(pop)
+        else:
+            seeds = [seed_rng.randrange(2**32) for ind in pop]
+        hits, misses = fitness_cache.hits, fitness_cache.misses
+        pending = []
+        for ind, ind_seed in zip(pop, seeds):
+            if ind.fitness.valid:
+                continue
+            key = FitnessCache.key(ind, ind_seed, None if batched else threshold, policy)
+            cached = fitness_cache.get(key)
+            if cached is not None:
+                ind.fitness.values = (cached[0],)
+            else:
+                pending.append((ind, ind_seed, key))
+        if batched:
+            results = evaluate_batch([list(ind) for ind, ind_seed, key in pending],
+                                     [ind_seed for ind, ind_seed, key in pending], policy)
+        else:
+            results = toolbox.map(toolbox.evaluate, [list(ind) for ind, ind_seed, key in pending],
+                                  [ind_seed for ind, ind_seed, key in pending], [threshold] * len(pending))
+        for (ind, ind_seed, key), (score, n_placements) in zip(pending, results):
+            placements += n_placements
             ind.fitness.values = (score,)
+            fitness_cache.put(key, (score, n_placements))
+        best_seed = None
+        for ind, ind_seed in zip(pop, seeds):
+            score = ind.fitness.values[0]
+            scores.append(score)
             if score > best_score:
                 best_ind = ind
                 best_score = score
+                best_seed = ind_seed
+        elapsed = time.perf_counter() - start
+        print("Evaluated: %d/%d, Placements/sec: %.1f" % (len(pending), len(pop), placements / elapsed))
+        if args.replay_dir is not None and best_seed is not None:
+            record_games(best_ind, best_seed, os.path.join(args.replay_dir, "gen_%d" % g), policy)
+        if cutoff_quantile is not None:
+            threshold = float(np.quantile(scores, cutoff_quantile))
 
-        max_out.write(str(max(scores)) + "\n")
-        mean_out.write(str(np.mean(scores)) + "\n")
-        min_out.write(str(min(scores)) + "\n")
-        std_out.write(str(np.std(scores)) + "\n")
-        var_out.write(str(np.var(scores)) + "\n")
+        lookups = fitness_cache.hits + fitness_cache.misses - hits - misses
+        metrics_out.write({
+            "generation": g,
+            "max": max(scores),
+            "mean": float(np.mean(scores)),
+            "min": min(scores),
+            "std": float(np.std(scores)),
+            "var": float(np.var(scores)),
+            "evaluated": len(pending),
+            "eval_seconds": elapsed,
+            "placements": placements,
+            "placements_per_sec": placements / elapsed,
+            "cache_hit_rate": (fitness_cache.hits - hits) / lookups if lookups else 0.0,
+            "best_score": best_score,
+            "best_genome": list(best_ind),
+        })
 
         offspring = map(toolbox.clone, toolbox.select(pop, len(pop)))
         offspring = algorithms.varAnd(offspring, toolbox, prob_xover, prob_mut)
         pop[:] = offspring
 
-    max_out.close()
-    mean_out.close()
-    min_out.close()
-    std_out.close()
+        if g % checkpoint_every == 0 or g == n_gen:
+            checkpoint.save(checkpoint_path, {
+                "generation": g,
+                "population": [list(ind) for ind in pop],
+                "fitnesses": [ind.fitness.values if ind.fitness.valid else None for ind in pop],
+                "best_ind": list(best_ind),
+                "best_score": best_score,
+                "threshold": threshold,
+                "random_state": random.getstate(),
+                "numpy_state": np.random.get_state(),
+                "seed_rng_state": seed_rng.getstate(),
+            })
+
+    metrics_out.close()
+    fitness_cache.close()
+    if executor is not None:
+        executor.shutdown()
 
     print("Top Score:" + str(best_score))
-    file = open("best_weights50.txt", "w")
+    file = open(args.output, "w")
     file.write(str(best_ind))
-    file.close()
\ No newline at end of file
+    file.close()
+
+if __name__ == "__main__":
+    main()